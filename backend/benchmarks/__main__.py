@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner
+
+    PYTHONPATH=$(pwd) python -m backend.benchmarks micro --output micro.json
+    PYTHONPATH=$(pwd) python -m backend.benchmarks load --concurrency 32 --gemini-latency 2.0
+    PYTHONPATH=$(pwd) python -m backend.benchmarks compare old.json new.json
+"""
+
+import argparse
+
+from backend.benchmarks import report
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="suite", required=True)
+
+    micro = sub.add_parser("micro", help="flagging microbenchmarks against the in-memory Firestore fake")
+    micro.add_argument("--sizes", type=int, nargs="+", default=[70, 500, 2000, 10000], help="watchlist sizes")
+    micro.add_argument("--iterations", type=int, default=50, help="flag_ingredients_in_text calls per size")
+    micro.add_argument("--rule-iterations", type=int, default=20000, help="auto-flag rule evaluations")
+    micro.add_argument("--firestore-latency", type=float, default=0.0, help="seconds added to every Firestore call")
+    micro.add_argument("--output", help="write results as JSON for later comparison")
+
+    load = sub.add_parser("load", help="end-to-end load tests against local OFF/NCBI/Gemini stand-ins")
+    load.add_argument("--scenarios", nargs="+", default=["scan", "search", "brief", "brief_generation"],
+                      choices=["scan", "search", "brief", "brief_generation"])
+    load.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    load.add_argument("--concurrency", type=int, default=16)
+    load.add_argument("--distinct-barcodes", type=int, default=50)
+    load.add_argument("--watchlist-size", type=int, default=70)
+    load.add_argument("--off-latency", type=float, default=0.15)
+    load.add_argument("--ncbi-latency", type=float, default=0.25)
+    load.add_argument("--gemini-latency", type=float, default=1.5)
+    load.add_argument("--firestore-latency", type=float, default=0.01)
+    load.add_argument("--output", help="write results as JSON for later comparison")
+
+    compare = sub.add_parser("compare", help="compare two saved runs")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+
+    args = parser.parse_args()
+
+    if args.suite == "compare":
+        report.compare(args.baseline, args.candidate)
+        return
+
+    if args.suite == "micro":
+        from backend.benchmarks import micro as suite
+        settings = {"sizes": args.sizes, "iterations": args.iterations, "rule_iterations": args.rule_iterations,
+                    "firestore_latency": args.firestore_latency}
+        results = suite.run(**settings)
+    else:
+        from backend.benchmarks import load as suite
+        latency = {"off": args.off_latency, "ncbi": args.ncbi_latency, "gemini": args.gemini_latency}
+        settings = {"scenarios": args.scenarios, "requests_per_scenario": args.requests,
+                    "concurrency": args.concurrency, "distinct_barcodes": args.distinct_barcodes,
+                    "watchlist_size": args.watchlist_size, "latency": latency,
+                    "firestore_latency": args.firestore_latency}
+        results = suite.run(**settings)
+
+    report.print_table(results)
+    if args.output:
+        report.save(results, args.output, args.suite, settings)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
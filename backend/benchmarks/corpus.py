@@ -0,0 +1,133 @@
+"""
+Benchmark corpus
+Realistic OpenFoodFacts-style ingredient strings and watchlists of configurable size
+"""
+
+import json
+import os
+import random
+from datetime import datetime
+from itertools import chain
+from typing import Dict, List
+
+WATCHLIST_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ingredient_watchlist.json")
+
+# Ingredient lists in the shapes OpenFoodFacts actually returns: long, nested,
+# inconsistently cased, with percentages and parenthesised sub-ingredients
+INGREDIENT_TEXTS = [
+    "Carbonated water, high fructose corn syrup, caramel color, phosphoric acid, natural flavors, caffeine",
+    "Carbonated water, caramel color, aspartame, phosphoric acid, potassium benzoate, natural flavors, citric acid, caffeine",
+    "Enriched flour (wheat flour, niacin, reduced iron, thiamine mononitrate, riboflavin, folic acid), sugar, soybean oil, "
+    "cocoa (processed with alkali), high fructose corn syrup, leavening (baking soda, calcium phosphate), salt, soy lecithin, "
+    "chocolate, artificial flavor",
+    "Corn, vegetable oil (corn, canola, and/or sunflower oil), maltodextrin, salt, cheddar cheese, whey, monosodium glutamate, "
+    "buttermilk, romano cheese, whey protein concentrate, onion powder, corn flour, natural and artificial flavor, "
+    "dextrose, tomato powder, lactose, spices, artificial color (including yellow 6, yellow 5, and red 40), lactic acid, "
+    "citric acid, sugar, garlic powder, skim milk, red and green bell pepper powder, disodium inosinate, disodium guanylate",
+    "Water, sugar, contains 2% or less of: citric acid, sodium citrate, salt, monopotassium phosphate, gum arabic, "
+    "modified food starch, natural flavor, sucralose, glycerol ester of rosin, acesulfame potassium, blue 1",
+    "Whole grain oats, sugar, corn starch, honey, brown sugar syrup, salt, tripotassium phosphate, canola oil, "
+    "natural almond flavor, vitamin e (mixed tocopherols) added to preserve freshness",
+    "Milk, cream, sugar, corn syrup, whey, mono and diglycerides, guar gum, locust bean gum, carrageenan, polysorbate 80, "
+    "natural and artificial flavor, annatto",
+    "Pork, water, salt, contains 2% or less of sugar, sodium phosphates, sodium erythorbate, sodium nitrite, natural flavor",
+    "Sugar, corn syrup, modified corn starch, contains less than 2% of citric acid, lactic acid, natural and artificial "
+    "flavors, sodium citrate, carnauba wax, mineral oil, red 40, yellow 5, yellow 6, blue 1, titanium dioxide",
+    "Water, soybean oil, vinegar, sugar, salt, egg yolk, xanthan gum, potassium sorbate, calcium disodium edta, "
+    "natural flavors, paprika extract",
+    "Organic rolled oats, organic cane sugar, organic sunflower oil, organic rice flour, sea salt, organic molasses, "
+    "baking soda, natural flavor",
+    "Carbonated water, citric acid, natural flavor, sodium benzoate, aspartame, potassium citrate, "
+    "acesulfame potassium, calcium disodium edta, brominated vegetable oil",
+    "Chicken broth, water, enriched egg noodles, chicken, modified food starch, salt, chicken fat, "
+    "autolyzed yeast extract, soy protein isolate, sodium phosphate, hydrolyzed vegetable protein, beta carotene, "
+    "dehydrated garlic, disodium guanylate, disodium inosinate",
+    "Maltitol, cocoa butter, whole milk powder, chocolate, inulin, soy lecithin, vanilla extract, stevia extract",
+    "Water, erythritol, natural flavors, citric acid, malic acid, sodium citrate, stevia leaf extract, gellan gum, "
+    "taurine, guarana seed extract, caffeine, niacinamide, pyridoxine hydrochloride, cyanocobalamin",
+    "Tomato concentrate, distilled vinegar, high fructose corn syrup, corn syrup, salt, spice, onion powder, natural flavoring",
+]
+
+# Building blocks for synthetic watchlist entries beyond the curated 70
+_PREFIXES = ["sodium", "potassium", "calcium", "magnesium", "disodium", "tripotassium", "ammonium", "ferric",
+             "zinc", "hydrolyzed", "modified", "polyglycerol", "propylene glycol", "sucrose", "acetylated"]
+_STEMS = ["benzoate", "sorbate", "phosphate", "citrate", "lactate", "alginate", "stearate", "succinate", "tartrate",
+          "carbonate", "gluconate", "sulfate", "caseinate", "ascorbate", "erythorbate", "fumarate", "malate",
+          "propionate", "acetate", "silicate", "polyphosphate", "esters of fatty acids", "oleate", "palmitate"]
+_SEVERITIES = ["low", "moderate", "high", "critical"]
+
+
+def load_curated_watchlist() -> Dict[str, List[str]]:
+    with open(WATCHLIST_PATH) as f:
+        return json.load(f)
+
+
+def ingredient_tokens() -> List[str]:
+    """Every comma-separated token in the corpus, normalised the way the scanner sees them"""
+    return [token.strip().lower() for token in chain.from_iterable(text.split(",") for text in INGREDIENT_TEXTS)]
+
+
+def build_watchlist(size: int, seed: int = 7) -> Dict[str, List[str]]:
+    """Return a category -> names watchlist with `size` entries, curated entries first"""
+    rng = random.Random(seed)
+    watchlist = {category: list(names) for category, names in load_curated_watchlist().items()}
+    names = set(chain.from_iterable(watchlist.values()))
+    categories = list(watchlist)
+    total = sum(len(entries) for entries in watchlist.values())
+    serial = 0
+    while total < size:
+        name = f"{rng.choice(_PREFIXES)} {rng.choice(_STEMS)}"
+        if name in names:
+            serial += 1
+            name = f"{name} e{400 + serial}"
+        names.add(name)
+        watchlist[rng.choice(categories)].append(name)
+        total += 1
+    # Trim curated entries from the back when asked for fewer than the full list
+    excess = total - size
+    for category in reversed(categories):
+        while excess > 0 and watchlist[category]:
+            watchlist[category].pop()
+            excess -= 1
+    return watchlist
+
+
+def seed_firestore(db, watchlist: Dict[str, List[str]], seed: int = 7) -> None:
+    """Write a watchlist into a Firestore-compatible client in the IngredientService document shapes"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    batch = db.batch()
+    pending = 0
+    for category_name, names in watchlist.items():
+        category_id = category_name.lower().replace(" ", "_")
+        batch.set(db.collection("ingredient_categories").document(category_id), {
+            "id": category_id,
+            "name": category_name,
+            "description": f"Benchmark category: {category_name}",
+            "severity_level": rng.choice(_SEVERITIES),
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+        pending += 1
+        for name in names:
+            ingredient_id = f"{category_id}_{name.lower().replace(' ', '_')}"
+            batch.set(db.collection("ingredients").document(ingredient_id), {
+                "id": ingredient_id,
+                "name": name.lower(),
+                "aliases": [name],
+                "category_id": category_id,
+                "severity_level": rng.choice(_SEVERITIES),
+                "health_concerns": [],
+                "environmental_impact": None,
+                "research_summary": None,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            })
+            pending += 1
+            if pending >= 500:
+                batch.commit()
+                batch = db.batch()
+                pending = 0
+    batch.commit()
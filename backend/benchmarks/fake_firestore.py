@@ -0,0 +1,336 @@
+"""
+In-memory stand-in for the Firestore client
+Implements the subset of the google-cloud-firestore API the backend uses,
+with optional per-operation latency to approximate a real round trip
+"""
+
+import copy
+import sys
+import threading
+import time
+import types
+from typing import Any, Dict, List, Optional
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+def _get_field(data: Dict, path: str) -> Any:
+    value: Any = data
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _order_value(doc_id: str, data: Dict, field: str):
+    """Sort key that places missing values first, like Firestore orders nulls"""
+    value = doc_id if field == "__name__" else _get_field(data, field)
+    return (value is not None, value if value is not None else 0)
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str) -> Any:
+        return _get_field(self._data or {}, field_path)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestoreClient", collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self) -> FakeDocumentSnapshot:
+        self._client._delay()
+        with self._client._lock:
+            data = self._client._store.get(self._collection, {}).get(self.id)
+            return FakeDocumentSnapshot(self, copy.deepcopy(data))
+
+    def set(self, data: Dict, merge: bool = False) -> None:
+        self._client._delay()
+        self._client._write(self._collection, self.id, data, merge)
+
+    def update(self, data: Dict) -> None:
+        self._client._delay()
+        with self._client._lock:
+            if self.id not in self._client._store.get(self._collection, {}):
+                raise KeyError(f"No document to update: {self.path}")
+        self._client._write(self._collection, self.id, data, True)
+
+    def delete(self) -> None:
+        self._client._delay()
+        self._client._delete(self._collection, self.id)
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeFirestoreClient", collection: str):
+        self._client = client
+        self._collection = collection
+        self._filters: List = []
+        self._limit: Optional[int] = None
+        self._order: List = []
+        self._start_after: Optional[Any] = None
+        self._fields: Optional[List[str]] = None
+
+    def _copy(self) -> "FakeQuery":
+        query = FakeQuery(self._client, self._collection)
+        query._filters = list(self._filters)
+        query._limit = self._limit
+        query._order = list(self._order)
+        query._start_after = self._start_after
+        query._fields = self._fields
+        return query
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "FakeQuery":
+        query = self._copy()
+        query._filters.append((field_path, _OPERATORS[op_string], value))
+        return query
+
+    def limit(self, count: int) -> "FakeQuery":
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "FakeQuery":
+        query = self._copy()
+        query._order.append((field_path, direction == "DESCENDING"))
+        return query
+
+    def start_after(self, values: Any) -> "FakeQuery":
+        query = self._copy()
+        query._start_after = values
+        return query
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        query = self._copy()
+        query._fields = list(field_paths)
+        return query
+
+    def _sort_key(self, doc_id: str, data: Dict):
+        return tuple(_order_value(doc_id, data, field) for field, _ in self._order)
+
+    def stream(self):
+        self._client._delay()
+        with self._client._lock:
+            items = list(self._client._store.get(self._collection, {}).items())
+        items = [
+            (doc_id, data) for doc_id, data in items
+            if all(op(_get_field(data, field), value) for field, op, value in self._filters)
+        ]
+        for field, descending in reversed(self._order):
+            items.sort(key=lambda item: _order_value(item[0], item[1], field), reverse=descending)
+        if self._start_after is not None and self._order:
+            cursor = self._start_after
+            if isinstance(cursor, FakeDocumentSnapshot):
+                cursor = self._sort_key(cursor.id, cursor._data or {})
+            elif isinstance(cursor, dict):
+                cursor = tuple(_order_value(cursor.get("__name__"), cursor, field) for field, _ in self._order)
+            else:
+                cursor = tuple(_order_value(value, {}, "__name__") for value in (cursor if isinstance(cursor, tuple) else (cursor,)))
+            descending = self._order[0][1]
+            items = [
+                item for item in items
+                if (self._sort_key(*item) < cursor if descending else self._sort_key(*item) > cursor)
+            ]
+        if self._limit is not None:
+            items = items[:self._limit]
+        for doc_id, data in items:
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            yield FakeDocumentSnapshot(FakeDocumentReference(self._client, self._collection, doc_id), copy.deepcopy(data))
+
+    def get(self) -> List[FakeDocumentSnapshot]:
+        return list(self.stream())
+
+    def _matches(self, data: Dict) -> bool:
+        return all(op(_get_field(data, field), value) for field, op, value in self._filters)
+
+    def on_snapshot(self, callback) -> "FakeWatch":
+        """Listen for changes; unlike Firestore, callbacks run synchronously on the writing thread
+        and there is no initial snapshot"""
+        watch = FakeWatch(self, callback)
+        with self._client._lock:
+            self._client._watches.append(watch)
+        return watch
+
+
+class FakeWatch:
+    def __init__(self, query: FakeQuery, callback):
+        self._query = query
+        self._callback = callback
+
+    def unsubscribe(self) -> None:
+        with self._query._client._lock:
+            if self in self._query._client._watches:
+                self._query._client._watches.remove(self)
+
+
+class FakeDocumentChange:
+    def __init__(self, kind: str, document: FakeDocumentSnapshot):
+        self.type = types.SimpleNamespace(name=kind)
+        self.document = document
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: "FakeFirestoreClient", name: str):
+        super().__init__(client, name)
+        self.id = name.rsplit("/", 1)[-1]
+
+    def document(self, doc_id: Optional[str] = None) -> FakeDocumentReference:
+        if doc_id is None:
+            doc_id = f"auto{next(self._client._auto_ids)}"
+        # Like the real client, a "/" would address a subcollection rather than a document here
+        if not doc_id or "/" in doc_id:
+            raise ValueError(f"Invalid document id: {doc_id!r}")
+        return FakeDocumentReference(self._client, self._collection, doc_id)
+
+
+class FakeWriteBatch:
+    def __init__(self, client: "FakeFirestoreClient"):
+        self._client = client
+        self._ops: List = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict, merge: bool = False) -> None:
+        self._ops.append(("set", reference, data, merge))
+
+    def update(self, reference: FakeDocumentReference, data: Dict) -> None:
+        self._ops.append(("set", reference, data, True))
+
+    def delete(self, reference: FakeDocumentReference) -> None:
+        self._ops.append(("delete", reference, None, False))
+
+    def commit(self) -> None:
+        if len(self._ops) > 500:
+            raise ValueError("A write batch can contain at most 500 operations")
+        self._client._delay()
+        for kind, reference, data, merge in self._ops:
+            if kind == "delete":
+                self._client._delete(reference._collection, reference.id)
+            else:
+                self._client._write(reference._collection, reference.id, data, merge)
+        self._ops = []
+
+
+class FakeFirestoreClient:
+    """Thread-safe in-memory Firestore client"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._store: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.RLock()
+        self._auto_ids = iter(range(1, sys.maxsize))
+        self._watches: List = []
+
+    def _delay(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _write(self, collection: str, doc_id: str, data: Dict, merge: bool) -> None:
+        with self._lock:
+            docs = self._store.setdefault(collection, {})
+            current = copy.deepcopy(docs.get(doc_id, {})) if merge else {}
+            for key, value in data.items():
+                if "." in key and merge:
+                    head, _, tail = key.rpartition(".")
+                    target = current
+                    for part in head.split("."):
+                        target = target.setdefault(part, {})
+                else:
+                    target, tail = current, key
+                _merge_value(target, tail, value, merge)
+            existed = doc_id in docs
+            docs[doc_id] = current
+        self._notify(collection, doc_id, current, "MODIFIED" if existed else "ADDED")
+
+    def _delete(self, collection: str, doc_id: str) -> None:
+        with self._lock:
+            existed = self._store.get(collection, {}).pop(doc_id, None) is not None
+        if existed:
+            self._notify(collection, doc_id, None, "REMOVED")
+
+    def _notify(self, collection: str, doc_id: str, data: Optional[Dict], kind: str) -> None:
+        with self._lock:
+            watches = [watch for watch in self._watches if watch._query._collection == collection]
+        for watch in watches:
+            if kind != "REMOVED" and not watch._query._matches(data):
+                continue
+            snapshot = FakeDocumentSnapshot(FakeDocumentReference(self, collection, doc_id), copy.deepcopy(data))
+            watch._callback([snapshot], [FakeDocumentChange(kind, snapshot)], time.time())
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+def _merge_value(target: Dict, key: str, value: Any, merge: bool) -> None:
+    """Write one field; with merge, nested maps are merged key by key as Firestore does"""
+    if _is_delete(value):
+        target.pop(key, None)
+    elif merge and isinstance(value, dict):
+        nested = target.get(key)
+        if not isinstance(nested, dict):
+            nested = target[key] = {}
+        for nested_key, nested_value in value.items():
+            _merge_value(nested, nested_key, nested_value, merge)
+    else:
+        target[key] = _resolve(target.get(key), value)
+
+
+def _resolve(current: Any, value: Any) -> Any:
+    """Apply Firestore sentinel transforms (Increment, ArrayUnion, ...) if present"""
+    transform = type(value).__name__
+    if transform == "Increment":
+        return (current or 0) + value.value
+    if transform == "ArrayUnion":
+        merged = list(current or [])
+        merged.extend(v for v in value.values if v not in merged)
+        return merged
+    if transform == "ArrayRemove":
+        return [v for v in (current or []) if v not in value.values]
+    return copy.deepcopy(value)
+
+
+def _is_delete(value: Any) -> bool:
+    return type(value).__name__ == "Sentinel" and "DELETE" in repr(value)
+
+
+def install_fake_firestore(latency: float = 0.0) -> FakeFirestoreClient:
+    """Register the fake as backend.firebase_init.db; call before importing backend.main"""
+    client = FakeFirestoreClient(latency=latency)
+    module = sys.modules.get("backend.firebase_init")
+    if module is None:
+        module = types.ModuleType("backend.firebase_init")
+        sys.modules["backend.firebase_init"] = module
+    module.db = client
+    return client
@@ -0,0 +1,172 @@
+"""
+Local stand-ins for OpenFoodFacts, NCBI E-utilities and Gemini
+One threaded HTTP server answers all three with canned but realistic payloads
+after a configurable per-service delay
+"""
+
+import itertools
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+from backend.benchmarks.corpus import INGREDIENT_TEXTS
+
+DEFAULT_LATENCY = {"off": 0.15, "ncbi": 0.25, "gemini": 1.5}
+
+_ABSTRACT = (
+    "Background: {term} is a widely used food additive. Methods: we reviewed toxicity and safety data from "
+    "animal and human studies. Results: at typical dietary exposure {term} showed no consistent adverse effects, "
+    "although high doses were associated with changes in gut microbiota in rodents. Conclusions: current evidence "
+    "supports the safety of {term} at approved intake levels, but long-term human data remain limited."
+)
+
+
+def _product(barcode: str, overrides: Optional[Dict[str, Dict]] = None) -> Dict:
+    text = (overrides or {}).get(barcode, {}).get("ingredients_text") or \
+        INGREDIENT_TEXTS[zlib.crc32(barcode.encode()) % len(INGREDIENT_TEXTS)]
+    return {
+        "code": barcode,
+        "product_name": f"Benchmark product {barcode}",
+        "brands": "Vireo Bench Co",
+        "packaging": "plastic",
+        "packaging_recycling": "yes",
+        "nutriscore_grade": "c",
+        "environment_impact_level_tags": ["en:moderate"],
+        "ingredients_text": text,
+        "ingredients": [
+            {"id": f"en:{token.strip().lower().replace(' ', '-')}", "text": token.strip(),
+             "vegan": "maybe", "vegetarian": "yes", "from_palm_oil": "no"}
+            for token in text.split(",")
+        ],
+        "image_url": f"https://images.example.invalid/{barcode}.jpg",
+    }
+
+
+class FakeServices:
+    """Serves OFF, NCBI and Gemini endpoints on one local port"""
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None, host: str = "127.0.0.1", port: int = 0):
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self._pubmed_terms: Dict[str, str] = {}
+        self._pubmed_ids = itertools.count(30000000)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {"off": 0, "ncbi": 0, "gemini": 0}
+        # barcode -> {"ingredients_text": ...} to simulate a product reformulated upstream
+        self.product_overrides: Dict[str, Dict] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the backend at these services"""
+        return {
+            "OFF_BASE_URL": self.base_url,
+            "NCBI_BASE_URL": self.base_url,
+            "GEMINI_API_ENDPOINT": self.base_url,
+            "GEMINI_API_KEY": "benchmark",
+        }
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload: Dict, status: int = 200) -> None:
+                self._send(status, json.dumps(payload).encode(), "application/json")
+
+            def _wait(self, service: str) -> None:
+                with services._lock:
+                    services.requests[service] += 1
+                delay = services.latency.get(service, 0.0)
+                if delay:
+                    time.sleep(delay)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if url.path.startswith("/api/v0/product/"):
+                    self._wait("off")
+                    barcode = url.path.rsplit("/", 1)[-1].removesuffix(".json")
+                    self._json({"status": 1, "code": barcode, "product": _product(barcode, services.product_overrides)})
+                elif url.path == "/api/v2/search" and "code" in query:
+                    self._wait("off")
+                    codes = [code for code in query["code"].split(",") if code]
+                    products = [_product(code, services.product_overrides) for code in codes]
+                    self._json({"count": len(products), "page": 1, "products": products})
+                elif url.path == "/cgi/search.pl":
+                    self._wait("off")
+                    size = int(query.get("page_size", 10))
+                    seed = zlib.crc32(query.get("search_terms", "").encode())
+                    self._json({"count": size, "products": [_product(str(seed + i)) for i in range(size)]})
+                elif url.path.endswith("/esearch.fcgi"):
+                    self._wait("ncbi")
+                    term = query.get("term", "").split(")")[0].lstrip("(")
+                    ids = []
+                    with services._lock:
+                        for _ in range(int(query.get("retmax", 5))):
+                            pmid = str(next(services._pubmed_ids))
+                            services._pubmed_terms[pmid] = term
+                            ids.append(pmid)
+                    self._json({"esearchresult": {"count": str(len(ids)), "idlist": ids}})
+                elif url.path.endswith("/efetch.fcgi"):
+                    self._wait("ncbi")
+                    articles = []
+                    for pmid in query.get("id", "").split(","):
+                        term = escape(services._pubmed_terms.get(pmid, "the additive"))
+                        articles.append(
+                            f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+                            f"<ArticleTitle>Safety assessment of {term}: study {pmid}</ArticleTitle>"
+                            f"<Abstract><AbstractText>{_ABSTRACT.format(term=term)}</AbstractText></Abstract>"
+                            f"</Article></MedlineCitation></PubmedArticle>"
+                        )
+                    body = f"<?xml version=\"1.0\"?><PubmedArticleSet>{''.join(articles)}</PubmedArticleSet>"
+                    self._send(200, body.encode(), "text/xml")
+                else:
+                    self._json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                if ":generateContent" in self.path:
+                    self._wait("gemini")
+                    text = (
+                        "Despite concerns, research suggests this ingredient is safe at typical intake levels. "
+                        "Some animal studies report effects at very high doses, and long-term human evidence is limited."
+                    )
+                    self._json({"candidates": [{
+                        "content": {"parts": [{"text": text}], "role": "model"},
+                        "finishReason": "STOP",
+                        "index": 0,
+                    }]})
+                else:
+                    self._json({"error": "not found"}, status=404)
+
+        return Handler
@@ -0,0 +1,149 @@
+"""
+End-to-end load tests
+Boots the FastAPI app under uvicorn with the in-memory Firestore fake and the
+local OFF/NCBI/Gemini stand-ins, then drives /scan, /search-products and
+/ingredient-brief with concurrent clients
+"""
+
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from backend.benchmarks.corpus import build_watchlist, seed_firestore
+from backend.benchmarks.fake_firestore import install_fake_firestore
+from backend.benchmarks.fake_services import FakeServices
+from backend.benchmarks.report import summarize
+from backend.utils.prompts import PROMPT_VERSION
+
+SCENARIOS = ("scan", "search", "brief", "brief_generation")
+
+_SEARCH_QUERIES = ["cola", "chips", "cereal", "ice cream", "gummy", "soup", "granola", "ketchup", "energy drink"]
+
+
+class _Server:
+    """Runs the app under uvicorn in a background thread"""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="vireo-bench", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _drive(name: str, call: Callable[[requests.Session, int], None], total: int, concurrency: int) -> Dict:
+    """Issue `total` calls from `concurrency` threads and summarise latencies"""
+    local = threading.local()
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            call(session, i)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return summarize(name, latencies, time.perf_counter() - start, errors=errors, concurrency=concurrency)
+
+
+def run(scenarios=SCENARIOS, requests_per_scenario: int = 200, concurrency: int = 16, distinct_barcodes: int = 50,
+        watchlist_size: int = 70, latency: Optional[Dict[str, float]] = None,
+        firestore_latency: float = 0.01) -> List[Dict]:
+    services = FakeServices(latency=latency).start()
+    os.environ.update(services.env())
+    db = install_fake_firestore(latency=firestore_latency)
+    seed_firestore(db, build_watchlist(watchlist_size))
+
+    # Imported only now: the app reads base URLs and binds the Firestore client at import time
+    from backend.main import app
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    results = []
+
+    def measure(name, call, total):
+        """Drive one scenario and record how many upstream calls it caused"""
+        before = dict(services.requests)
+        result = _drive(name, call, total, concurrency)
+        result["upstream_requests"] = {key: services.requests[key] - before[key] for key in before}
+        results.append(result)
+
+    try:
+        with _Server(app, port):
+            if "scan" in scenarios:
+                def scan(session, i):
+                    barcode = str(4000000000000 + i % distinct_barcodes)
+                    session.post(f"{base}/scan", json={"barcode": barcode}, timeout=60).raise_for_status()
+                measure("scan", scan, requests_per_scenario)
+
+            if "search" in scenarios:
+                def search(session, i):
+                    query = _SEARCH_QUERIES[i % len(_SEARCH_QUERIES)]
+                    session.post(f"{base}/search-products", json={"query": query, "limit": 10},
+                                 timeout=60).raise_for_status()
+                measure("search-products", search, requests_per_scenario)
+
+            if "brief" in scenarios:
+                # Repeated requests for a small popular set: mostly served from stored summaries
+                popular = ["aspartame", "red 40", "sucralose", "carrageenan", "sodium benzoate"]
+                for ingredient in popular:
+                    db.collection("ingredient_summaries").document(ingredient).set(
+                        {"summary": f"Stored benchmark summary for {ingredient}.", "prompt_version": PROMPT_VERSION})
+
+                def brief(session, i):
+                    session.post(f"{base}/ingredient-brief", json={"ingredient": popular[i % len(popular)]},
+                                 timeout=60).raise_for_status()
+                measure("ingredient-brief[cached]", brief, requests_per_scenario)
+
+            if "brief_generation" in scenarios:
+                # Distinct ingredients, measured until the background generation completes
+                def generation(session, i):
+                    ingredient = f"benchmark additive {i}"
+                    session.post(f"{base}/ingredient-brief", json={"ingredient": ingredient},
+                                 timeout=60).raise_for_status()
+                    while True:
+                        progress = session.get(f"{base}/ingredient-brief-progress/{ingredient}", timeout=60).json()
+                        if progress["status"] == "completed":
+                            return
+                        if progress["status"] == "failed":
+                            raise RuntimeError(progress.get("message"))
+                        time.sleep(0.05)
+                measure("ingredient-brief[generation]", generation, max(1, requests_per_scenario // 10))
+    finally:
+        services.stop()
+    return results
@@ -0,0 +1,63 @@
+"""
+Microbenchmarks for ingredient flagging
+Runs flag_ingredients_in_text and _should_flag_unknown_ingredient against the
+in-memory Firestore fake, across watchlist sizes
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Sequence
+
+from backend.benchmarks.corpus import INGREDIENT_TEXTS, build_watchlist, ingredient_tokens, seed_firestore
+from backend.benchmarks.fake_firestore import install_fake_firestore
+from backend.benchmarks.report import summarize
+
+DEFAULT_SIZES = (70, 500, 2000, 10000)
+
+
+async def _flagging(service, iterations: int) -> List[float]:
+    latencies = []
+    for i in range(iterations):
+        text = INGREDIENT_TEXTS[i % len(INGREDIENT_TEXTS)]
+        start = time.perf_counter()
+        await service.flag_ingredients_in_text(text)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _auto_rules(service, tokens: Sequence[str], iterations: int) -> List[float]:
+    latencies = []
+    for i in range(iterations):
+        token = tokens[i % len(tokens)]
+        start = time.perf_counter()
+        await service._should_flag_unknown_ingredient(token)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(sizes: Sequence[int] = DEFAULT_SIZES, iterations: int = 50, rule_iterations: int = 20000,
+        firestore_latency: float = 0.0) -> List[Dict]:
+    """Benchmark flagging for each watchlist size and the regex auto-flag rules"""
+    db = install_fake_firestore(latency=firestore_latency)
+    # Imported after the fake is installed so the service binds to it
+    from backend.utils.ingredient_service import IngredientService
+
+    results = []
+    for size in sizes:
+        db.clear()
+        seed_firestore(db, build_watchlist(size))
+        service = IngredientService()
+        asyncio.run(_flagging(service, 2))  # warm up
+
+        start = time.perf_counter()
+        latencies = asyncio.run(_flagging(service, iterations))
+        results.append(summarize(f"flag_ingredients_in_text[watchlist={size}]", latencies,
+                                 time.perf_counter() - start, watchlist_size=size))
+
+    service = IngredientService()
+    tokens = ingredient_tokens()
+    start = time.perf_counter()
+    latencies = asyncio.run(_auto_rules(service, tokens, rule_iterations))
+    results.append(summarize("_should_flag_unknown_ingredient", latencies, time.perf_counter() - start,
+                             distinct_tokens=len(set(tokens))))
+    return results
@@ -0,0 +1,92 @@
+"""
+Latency/throughput summaries and release-to-release comparison
+"""
+
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values), math.ceil(q / 100 * len(sorted_values))) - 1)
+    return sorted_values[rank]
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, errors: int = 0, **extra) -> Dict:
+    """Summarise per-operation latencies (seconds) measured over `elapsed` wall-clock seconds"""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    result = {
+        "name": name,
+        "count": count,
+        "errors": errors,
+        "throughput_per_s": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p90_ms": round(percentile(ordered, 90) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+    result.update(extra)
+    return result
+
+
+def print_table(results: List[Dict]) -> None:
+    columns = ["name", "count", "errors", "throughput_per_s", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms"]
+    widths = {col: max(len(col), *(len(str(r.get(col, ""))) for r in results)) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for result in results:
+        print("  ".join(str(result.get(col, "")).ljust(widths[col]) for col in columns))
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save(results: List[Dict], path: str, suite: str, settings: Dict) -> None:
+    """Write results with enough context to compare against another release"""
+    payload = {
+        "suite": suite,
+        "revision": _git_revision(),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": settings,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """Print the change in throughput and latency percentiles between two saved runs"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline['revision']} ({baseline['recorded_at']}) -> "
+          f"candidate {candidate['revision']} ({candidate['recorded_at']})")
+    previous = {r["name"]: r for r in baseline["results"]}
+    for result in candidate["results"]:
+        old = previous.get(result["name"])
+        if old is None:
+            print(f"{result['name']}: new benchmark")
+            continue
+        deltas = []
+        for metric in ("throughput_per_s", "p50_ms", "p95_ms", "p99_ms"):
+            before, after = old[metric], result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            deltas.append(f"{metric} {before} -> {after} ({change:+.1f}%)")
+        print(f"{result['name']}: " + ", ".join(deltas))
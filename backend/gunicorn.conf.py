@@ -0,0 +1,66 @@
+"""
+Production runner: N uvicorn workers under gunicorn sharing warm caches
+
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+The app is imported once in the master and forked into every worker. Firestore
+opens its gRPC channel lazily, so each worker gets its own on first use. The
+compiled watchlist index, encoded scan/brief payloads and brief generation
+progress live in a host-local SQLite cache that every worker reads, so a cache
+warmed by one worker is warm for all of them. On restart, workers stop
+admitting new brief generations and let in-flight ones finish before exiting.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "backend.workers.VireoWorker"
+preload_app = True
+
+keepalive = 5
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+# Must outlast GENERATION_DRAIN_SECONDS so a restarting worker is not killed mid-brief
+graceful_timeout = int(os.getenv("GENERATION_DRAIN_SECONDS", 90)) + 15
+# Recycle workers occasionally to bound memory growth; jitter keeps them from restarting together
+max_requests = int(os.getenv("MAX_REQUESTS", 20000))
+max_requests_jitter = max_requests // 10
+
+accesslog = None
+errorlog = "-"
+
+# Set before the app is preloaded so every module sees the shared tiers; /dev/shm keeps them in RAM
+_state_dir = "/dev/shm" if os.path.isdir("/dev/shm") else os.getenv("TMPDIR", "/tmp")
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(_state_dir, f"vireo-cache-{os.getuid()}.sqlite"))
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(_state_dir, f"vireo-metrics-{os.getuid()}"))
+# Unlike the cache, the watchlist snapshot is kept across restarts: it is versioned and re-checked on first use
+os.environ.setdefault("WATCHLIST_SNAPSHOT_PATH", os.path.join(_state_dir, f"vireo-watchlist-{os.getuid()}.snapshot"))
+
+
+def _reset_shared_state():
+    """Start from an empty cache and metrics directory; both are only valid for one master's lifetime
+
+    Runs when the config is loaded, because the preloaded app opens both before
+    any server hook fires. Config reloads on SIGHUP keep the state.
+    """
+    if os.environ.get("VIREO_SHARED_STATE_OWNER") == str(os.getpid()):
+        return
+    os.environ["VIREO_SHARED_STATE_OWNER"] = str(os.getpid())
+    for suffix in ("", "-wal", "-shm"):
+        path = os.environ["SHARED_CACHE_PATH"] + suffix
+        if os.path.exists(path):
+            os.remove(path)
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+_reset_shared_state()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Bulk import categories and ingredients from a JSON or CSV file
+Only new or changed records are written; run with --dry-run to preview
+
+    PYTHONPATH=$(pwd) python -m backend.import_ingredients additives.csv --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+from backend.utils.ingredient_import import parse_csv_payload, parse_json_payload
+from backend.utils.ingredient_service import IngredientService
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bulk import categories and ingredients")
+    parser.add_argument("path", help="JSON (structured or legacy watchlist shape) or CSV file")
+    parser.add_argument("--dry-run", action="store_true", help="show what would change without writing")
+    args = parser.parse_args()
+
+    print(f"🚀 Importing {args.path}...")
+    
+    try:
+        service = IngredientService()
+        
+        with open(args.path, encoding="utf-8-sig") as f:
+            if args.path.lower().endswith(".csv"):
+                payload = parse_csv_payload(f.read())
+            else:
+                payload = parse_json_payload(json.load(f), service._get_default_severity)
+        
+        if payload.errors:
+            print("❌ The file has errors, nothing was imported:")
+            for error in payload.errors:
+                print(f"   - {error}")
+            raise SystemExit(1)
+        
+        print(f"📄 Loaded {len(payload.categories)} categories and {len(payload.ingredients)} ingredients")
+        
+        summary = await service.bulk_upsert(payload, dry_run=args.dry_run)
+        
+        print("✅ Dry run completed (nothing written)" if args.dry_run else "✅ Import completed successfully!")
+        print("\n📊 Summary:")
+        for kind in ("categories", "ingredients"):
+            stats = summary[kind]
+            print(f"   - {kind}: {stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged")
+        print(f"   - {summary['writes']} writes in {summary['batches']} batches")
+        
+    except ValueError as e:
+        print(f"❌ Import failed: {e}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
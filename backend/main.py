@@ -1,25 +1,64 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from firebase_admin import credentials, firestore
 from dotenv import load_dotenv
 import json
+import logging
 import requests
 from itertools import chain
 import os
+import time
+import hashlib
+import orjson
 from backend.firebase_init import db
 
 
 from backend.utils.rag import rag_analysis
-from backend.utils.firestore import get_summary_from_firestore, store_summary_in_firestore
-from backend.utils.ingredient_service import IngredientService, IngredientCategory, Ingredient
-from dataclasses import asdict
+from backend.utils.prompts import PROMPT_VERSION
+from backend.utils.firestore import get_stored_summary, get_summary_from_firestore, store_summary_in_firestore
+from backend.utils.summary_cache import StoredSummary, summary_cache
+from backend.utils.ingredient_service import (
+    CATEGORY_FIELDS, INGREDIENT_FIELDS, IngredientService, IngredientCategory, Ingredient, IngredientFlag
+)
+from backend.utils.products import (
+    OFF_BASE_URL, OFF_TIMEOUT, ProductService, fetch_off_product, product_from_off, public_product
+)
+from backend.utils.brief_index import brief_index, build_brief_index
+from backend.utils.ingredient_stats import FLUSH_INTERVAL_SECONDS as STATS_FLUSH_INTERVAL, ingredient_stats, top_pairs
+from backend.utils.ingredient_import import parse_csv_payload, parse_json_payload
+from backend.utils.shared_cache import SharedDict, shared_cache
+from backend.utils.payloads import (
+    COMPRESS_MIN_BYTES, GZIP_LEVEL, PayloadCache, brief_payloads, dumps, encode_body, payload_response, scan_payloads
+)
+from backend.utils.watchlist_snapshot import MEDIA_TYPE as SNAPSHOT_MEDIA_TYPE, snapshot_etag
+from backend.utils.metrics import (
+    REQUEST_LATENCY, begin_request, configure_logging, end_request, record_cache,
+    render_metrics, request_logger, time_stage, track_external
+)
+from backend.utils.resilience import (
+    DEFAULT_RATE_LIMIT, DependencyUnavailable, dependency, generation_admission
+)
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware
+from slowapi.util import get_remote_address
 import asyncio
 from enum import Enum
 
 # Initialize ingredient service
 ingredient_service = IngredientService()
+product_service = ProductService(ingredient_service)
+
+# Encoded watchlist snapshots, keyed by watchlist version
+snapshot_payloads = PayloadCache("watchlist_snapshot", max_entries=2)
+
+# Admin listing page sizes
+ADMIN_PAGE_SIZE = 100
+ADMIN_MAX_PAGE_SIZE = 500
 
 # Progress tracking for RAG generation
 class GenerationStatus(Enum):
@@ -29,12 +68,27 @@ class GenerationStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
-# In-memory progress tracking (in production, use Redis or Firestore)
-generation_progress = {}
+# Progress tracking, shared by every worker on the host when the shared cache is enabled
+GENERATION_PROGRESS_TTL = 15 * 60
+generation_progress = SharedDict(shared_cache, "generation_progress", ttl=GENERATION_PROGRESS_TTL)
+
+# Background generations owned by this worker, drained on shutdown
+GENERATION_DRAIN_SECONDS = float(os.getenv("GENERATION_DRAIN_SECONDS", 90))
+generation_tasks: Dict[asyncio.Task, str] = {}
+draining = False
 
 load_dotenv()
 
-app = FastAPI()
+configure_logging()
+logger = logging.getLogger(__name__)
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Per-client admission control for every route; brief generations have their own, stricter limits
+limiter = Limiter(key_func=get_remote_address, default_limits=[DEFAULT_RATE_LIMIT])
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(SlowAPIMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -45,6 +99,117 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Compress large uncached responses; pre-encoded payloads already carry Content-Encoding and pass through
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+@app.middleware("http")
+async def log_request_timings(request: Request, call_next):
+    """Record request latency and emit one structured log line with per-stage timings"""
+    token = begin_request()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        duration = time.perf_counter() - start
+        stages = end_request(token)
+        endpoint = getattr(request.scope.get("endpoint"), "__name__", "unmatched")
+        REQUEST_LATENCY.labels(method=request.method, endpoint=endpoint, status=str(status_code)).observe(duration)
+        request_logger.info(
+            "request_completed",
+            method=request.method,
+            path=request.url.path,
+            endpoint=endpoint,
+            status=status_code,
+            duration_ms=round(duration * 1000, 3),
+            stages=stages,
+        )
+
+@app.exception_handler(DependencyUnavailable)
+async def dependency_unavailable_handler(request: Request, exc: DependencyUnavailable):
+    """Fail fast with 503 while a dependency's circuit is open or its bulkhead is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"{exc.dependency} is temporarily unavailable, please try again shortly"},
+        headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+    )
+
+@app.on_event("startup")
+async def load_watchlist_snapshot():
+    """Map the watchlist snapshot left by the last run, so the first scan needs no full Firestore read"""
+    try:
+        if ingredient_service.load_snapshot():
+            logger.info("Watchlist snapshot loaded")
+    except Exception as e:
+        logger.error(f"Error loading watchlist snapshot: {e}")
+
+@app.on_event("startup")
+async def listen_for_summaries():
+    """Keep the summary cache in step with briefs stored by other workers and hosts"""
+    if db is not None and summary_cache.listen(db):
+        logger.info("Listening for ingredient summary changes")
+
+@app.on_event("shutdown")
+async def stop_summary_listener():
+    summary_cache.stop()
+
+@app.on_event("startup")
+async def load_brief_index():
+    """Build the brief reuse index in the background so startup never waits on Firestore"""
+    async def build():
+        try:
+            ingredients = await ingredient_service.get_all_ingredients()
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, build_brief_index, db, ingredients)
+            logger.info(f"Brief index loaded with {len(brief_index)} names")
+        except Exception as e:
+            logger.error(f"Error building brief index: {e}")
+
+    asyncio.create_task(build())
+
+@app.on_event("shutdown")
+async def drain_generations():
+    """Stop admitting brief generations and let in-flight ones finish before the worker exits"""
+    global draining
+    draining = True
+    pending = [task for task in generation_tasks if not task.done()]
+    if not pending:
+        return
+    logger.info(f"Draining {len(pending)} brief generation(s)...")
+    _, unfinished = await asyncio.wait(pending, timeout=GENERATION_DRAIN_SECONDS)
+    for task in unfinished:
+        task.cancel()
+        # Let a poller (on any worker) see the failure and retry instead of waiting forever
+        generation_progress[generation_tasks[task]] = {
+            "status": GenerationStatus.FAILED.value,
+            "message": "Brief generation was interrupted by a restart, please try again"
+        }
+    logger.info(f"Drained brief generations ({len(unfinished)} interrupted)")
+
+@app.on_event("startup")
+async def start_stats_flusher():
+    """Periodically write buffered flag statistics to Firestore"""
+    async def flush_periodically():
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(STATS_FLUSH_INTERVAL)
+            try:
+                await loop.run_in_executor(None, ingredient_stats.flush)
+            except Exception as e:
+                logger.error(f"Error flushing ingredient stats: {e}")
+
+    asyncio.create_task(flush_periodically())
+
+@app.on_event("shutdown")
+async def flush_stats_on_shutdown():
+    """Write whatever statistics this worker still buffers; runs after generations have drained"""
+    try:
+        ingredient_stats.flush()
+    except Exception as e:
+        logger.error(f"Error flushing ingredient stats: {e}")
+
 # Models
 class Ingredient(BaseModel):
     id: Optional[str] = None
@@ -94,13 +259,21 @@ class CategoryCreateRequest(BaseModel):
 async def root():
     return {"message": "Hello Vireo Backend!"}
 
+@app.get("/metrics")
+@limiter.exempt
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/products/{barcode}", response_model=Product)
 async def get_product(barcode: str):
     if db is None:
         raise HTTPException(status_code=500, detail="Firebase not initialized")
 
     product_ref = db.collection("products").document(barcode)
-    product_doc = product_ref.get()
+    with dependency("firestore").guard(), track_external("firestore", "product_get"):
+        product_doc = product_ref.get()
 
     if product_doc.exists:
         return Product(**product_doc.to_dict())
@@ -108,7 +281,7 @@ async def get_product(barcode: str):
         raise HTTPException(status_code=404, detail=f"Product with barcode '{barcode}' not found")
 
 @app.post("/scan")
-async def scan_barcode(scan: ScanRequest):
+async def scan_barcode(scan: ScanRequest, request: Request):
     if db is None:
         raise HTTPException(status_code=500, detail="Firebase not initialized")
     else:
@@ -116,25 +289,60 @@ async def scan_barcode(scan: ScanRequest):
 
     barcode = scan.barcode
     product_ref = db.collection("products").document(barcode)
-    product_doc = product_ref.get()
-    
-
-    #if product_doc.exists:
-    #    return Product(**product_doc.to_dict())
-
-    # Fetch from OpenFoodFacts
-    OFF_URL = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-    res = requests.get(OFF_URL)
+    try:
+        with dependency("firestore").guard(), track_external("firestore", "product_get"):
+            product_doc = product_ref.get()
+        stored_product = product_doc.to_dict() if product_doc.exists else None
+    except Exception as e:
+        # The stored copy is only a fallback, so a Firestore outage must not block a fresh scan
+        logger.error(f"Error reading stored product {barcode}: {e}")
+        stored_product = None
 
-    if res.status_code != 200 or res.json().get("status") == 0:
+    # Fetch from OpenFoodFacts (in a thread so a slow OFF never stalls the event loop; to_thread
+    # carries the request context along, so the OFF time shows up in the request's timing log)
+    try:
+        off_data = await asyncio.to_thread(fetch_off_product, barcode)
+    except (DependencyUnavailable, requests.RequestException) as e:
+        if stored_product is None:
+            if isinstance(e, DependencyUnavailable):
+                raise
+            raise HTTPException(status_code=503, detail="OpenFoodFacts is temporarily unavailable")
+        # OFF is degraded: serve the copy stored by an earlier scan instead of failing
+        return await build_scan_response(barcode, public_product(stored_product), request, stale=True,
+                                         flags=await product_service.stored_scan(stored_product))
+
+    if off_data is None:
         raise HTTPException(status_code=404, detail="Product not found in OpenFoodFacts")
 
-    off_data = res.json()["product"]
-
-    raw_ingredients = off_data.get("ingredients_text", "")
+    product_data = product_from_off(barcode, off_data)
+    # Store in Firestore, re-flagging only ingredients that are new since the stored copy
+    flags = None
+    try:
+        flags, _ = await product_service.record_fetch(barcode, product_data, stored_product)
+    except Exception as e:
+        logger.error(f"Error storing product {barcode}: {e}")
+
+    return await build_scan_response(barcode, product_data, request, flags=flags)
+
+async def build_scan_response(barcode: str, product_data: dict, request: Request, stale: bool = False,
+                              flags: Optional[List[IngredientFlag]] = None) -> Response:
+    """Flag a product's ingredients (unless `flags` are already known) and serve the /scan response,
+    reusing the encoded bytes when nothing changed"""
+    index = await ingredient_service.get_watchlist_index()
+    with time_stage("scan.fingerprint"):
+        product_hash = hashlib.sha1(dumps(product_data, sort_keys=True)).hexdigest()
+    fingerprint = f"{index.version}:{int(stale)}:{product_hash}"
+    cached = scan_payloads.get(barcode, fingerprint)
+    if cached:
+        return payload_response(cached, request)
+    
+    raw_ingredients = product_data.get("ingredients_text") or ""
     
     # Use the new ingredient service to flag ingredients
-    flagged_ingredient_objects = await ingredient_service.flag_ingredients_in_text(raw_ingredients)
+    flagged_ingredient_objects = flags
+    if flagged_ingredient_objects is None:
+        with time_stage("scan.flag"):
+            flagged_ingredient_objects = await ingredient_service.flag_ingredients_in_text(raw_ingredients)
     flagged_ingredients = [flag.ingredient_name for flag in flagged_ingredient_objects]
     
     # Store flagged ingredient metadata for research brief generation
@@ -143,37 +351,42 @@ async def scan_barcode(scan: ScanRequest):
             "category": flag.category,
             "severity": flag.severity,
             "health_concerns": flag.health_concerns,
-            "has_research_summary": bool(flag.research_summary)
+            "has_research_summary": flag.has_research_summary
         } for flag in flagged_ingredient_objects
     }
-    
-    product_data = {
-        "barcode": barcode,
-        "name": off_data.get("product_name"),
-        "brand": off_data.get("brands"),
-        "packaging_material": off_data.get("packaging"),
-        "packaging_recyclable": off_data.get("packaging_recycling") == "yes",
-        "nutriscore": off_data.get("nutriscore_grade"),
-        "eco_score_level": off_data.get("environment_impact_level_tags"),
-        "ingredients_text": off_data.get("ingredients_text"),
-        "ingredients": off_data.get("ingredients", []),
-        "image_url": off_data.get("image_url")
-    }
-    # Store in Firestore
-    product_ref.set(product_data)
 
-    return {
-        "product": product_data,
-        "flagged_ingredients": flagged_ingredients,
-        "flagged_ingredients_metadata": flagged_ingredients_metadata
-    }
+    with time_stage("scan.encode"):
+        payload = scan_payloads.put(barcode, {
+            "product": product_data,
+            "flagged_ingredients": flagged_ingredients,
+            "flagged_ingredients_metadata": flagged_ingredients_metadata,
+            "stale": stale
+        }, fingerprint)
+    return payload_response(payload, request)
+
+@app.get("/watchlist/snapshot")
+async def get_watchlist_snapshot(request: Request):
+    """Compiled watchlist as a binary snapshot for offline flagging; revalidate with If-None-Match"""
+    version = (await ingredient_service.get_watchlist_index()).version
+    payload = snapshot_payloads.get(str(version))
+    if payload is None:
+        snapshot = await ingredient_service.get_watchlist_snapshot()
+        payload = snapshot_payloads.put_payload(
+            str(snapshot.version), encode_body(snapshot.data, media_type=SNAPSHOT_MEDIA_TYPE))
+    etag = snapshot_etag(payload.body)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response = payload_response(payload, request)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 @app.post("/search-products")
 async def search_products(request: ProductSearchRequest):
     """Search for products by name using OpenFoodFacts API"""
     try:
         # Use OpenFoodFacts search API
-        search_url = "https://world.openfoodfacts.org/cgi/search.pl"
+        search_url = f"{OFF_BASE_URL}/cgi/search.pl"
         search_params = {
             "search_terms": request.query,
             "search_simple": 1,
@@ -182,7 +395,14 @@ async def search_products(request: ProductSearchRequest):
             "page_size": request.limit
         }
         
-        response = requests.get(search_url, params=search_params, timeout=10)
+        def fetch():
+            with dependency("openfoodfacts").guard(), track_external("openfoodfacts", "search"):
+                res = requests.get(search_url, params=search_params, timeout=OFF_TIMEOUT)
+                if res.status_code >= 500 or res.status_code == 429:
+                    res.raise_for_status()
+            return res
+        
+        response = await asyncio.to_thread(fetch)
         
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail="Failed to search products")
@@ -208,6 +428,8 @@ async def search_products(request: ProductSearchRequest):
             "total_results": len(formatted_products)
         }
         
+    except DependencyUnavailable:
+        raise
     except requests.RequestException as e:
         raise HTTPException(status_code=500, detail=f"Search service unavailable: {str(e)}")
     except Exception as e:
@@ -223,29 +445,97 @@ async def get_ingredient_brief_progress(ingredient: str):
     })
     return progress
 
+def brief_fingerprint(ingredient: str) -> str:
+    """Encoded briefs are shared by every spelling of a name and roll over with the prompt template"""
+    return f"{PROMPT_VERSION}:{ingredient}"
+
+def brief_response(payload, ingredient: str, requested_name: str, http_request: Request):
+    """Serve an encoded brief, echoing the caller's spelling when it differs from the normalized name
+
+    Label spellings ("Sodium Benzoate") get their own encoded copy. Its fingerprint
+    includes a digest of the normalized brief's bytes, so it rolls over with it.
+    """
+    if requested_name == ingredient:
+        return payload_response(payload, http_request)
+    key = f"{ingredient}|{requested_name}"
+    fingerprint = f"{payload.fingerprint}:{hashlib.sha1(payload.body).hexdigest()[:16]}"
+    variant = brief_payloads.get(key, fingerprint)
+    if variant is None:
+        content = orjson.loads(payload.body)
+        content["ingredient"] = requested_name
+        variant = brief_payloads.put(key, content, fingerprint)
+    return payload_response(variant, http_request)
+
 @app.post("/ingredient-brief")
-async def get_ingredient_brief(request: IngredientBriefRequest):
+async def get_ingredient_brief(request: IngredientBriefRequest, http_request: Request):
     if db is None:
         raise HTTPException(status_code=500, detail="Firebase not initialized")
     
     ingredient = request.ingredient.lower().strip()
     
-    # Check if we have a stored summary in Firestore
-    summary = get_summary_from_firestore(ingredient)
+    # Completed briefs are served straight from their encoded bytes
+    cached = brief_payloads.get(ingredient, brief_fingerprint(ingredient))
+    if cached:
+        return brief_response(cached, ingredient, request.ingredient, http_request)
+    
+    # Check if we have a stored summary (cached in front of Firestore)
+    stored = get_stored_summary(ingredient)
+    summary = stored.summary if stored else None
+    if not summary:
+        # A brief another worker just finished may still be cached here as missing; its progress carries the text
+        progress = generation_progress.get(ingredient) or {}
+        if progress.get("status") == GenerationStatus.COMPLETED.value and progress.get("summary"):
+            summary = progress["summary"]
+            summary_cache.put(ingredient, StoredSummary(summary, PROMPT_VERSION), shared=False)
+    elif not stored.current:
+        # Written with an older prompt template: serve it while a current one is generated
+        regenerate_stale_brief(ingredient)
     
     if not summary:
+        # Serve the brief of a spelling variant before paying for a new generation; the link is
+        # not stored, so a wrong match never outlives the cached response
+        match = brief_index.find(ingredient)
+        record_cache("brief_reuse", match is not None)
+        if match and match.canonical != ingredient:
+            canonical_summary = get_summary_from_firestore(match.canonical)
+            if canonical_summary:
+                payload = brief_payloads.put(ingredient, {
+                    "ingredient": ingredient,
+                    "summary": canonical_summary,
+                    "in_progress": False,
+                    "canonical_ingredient": match.canonical
+                }, brief_fingerprint(ingredient))
+                return brief_response(payload, ingredient, request.ingredient, http_request)
+        
         # Check if generation is already in progress
-        if ingredient in generation_progress and generation_progress[ingredient]["status"] in [GenerationStatus.SEARCHING_RESEARCH.value, GenerationStatus.GENERATING_SUMMARY.value]:
+        # One read: the shared entry can expire between a membership test and a lookup
+        progress = generation_progress.get(ingredient)
+        if progress and progress["status"] in [GenerationStatus.SEARCHING_RESEARCH.value, GenerationStatus.GENERATING_SUMMARY.value]:
             return {
                 "ingredient": request.ingredient,
                 "summary": None,
                 "in_progress": True,
-                "status": generation_progress[ingredient]["status"],
-                "message": generation_progress[ingredient]["message"]
+                "status": progress["status"],
+                "message": progress["message"]
             }
         
+        # Don't queue work that cannot finish while research sources are down
+        for name in ("ncbi", "gemini"):
+            if not dependency(name).available:
+                raise DependencyUnavailable(name, "circuit open", dependency(name).breaker.retry_after())
+        
+        # A worker that is shutting down finishes what it has but starts nothing new
+        if draining:
+            raise HTTPException(status_code=503, detail="Server is restarting, please try again shortly",
+                                headers={"Retry-After": "5"})
+        
+        # Shed expensive generations first; cached briefs above are never limited here
+        rejection = generation_admission.try_admit(get_remote_address(http_request))
+        if rejection:
+            raise HTTPException(status_code=429, detail=rejection, headers={"Retry-After": "30"})
+        
         # Start generation in background
-        asyncio.create_task(generate_ingredient_brief_async(ingredient))
+        start_brief_generation(ingredient)
         
         return {
             "ingredient": request.ingredient,
@@ -255,11 +545,29 @@ async def get_ingredient_brief(request: IngredientBriefRequest):
             "message": "Starting research..."
         }
     
-    return {
-        "ingredient": request.ingredient,
+    payload = brief_payloads.put(ingredient, {
+        "ingredient": ingredient,
         "summary": summary,
         "in_progress": False
-    }
+    }, brief_fingerprint(ingredient))
+    return brief_response(payload, ingredient, request.ingredient, http_request)
+
+def regenerate_stale_brief(ingredient: str) -> None:
+    """Start a background regeneration of an outdated brief if there is spare generation capacity"""
+    progress = generation_progress.get(ingredient)
+    if progress and progress["status"] in [GenerationStatus.SEARCHING_RESEARCH.value, GenerationStatus.GENERATING_SUMMARY.value]:
+        return
+    if draining or not all(dependency(name).available for name in ("ncbi", "gemini")):
+        return
+    # Regenerations share one admission key, so they never crowd out briefs nobody has yet
+    if generation_admission.try_admit("regenerate") is None:
+        start_brief_generation(ingredient)
+
+def start_brief_generation(ingredient: str) -> None:
+    """Run a generation in the background; the caller must already hold a generation_admission slot"""
+    task = asyncio.create_task(generate_ingredient_brief_async(ingredient))
+    generation_tasks[task] = ingredient
+    task.add_done_callback(lambda done: generation_tasks.pop(done, None))
 
 async def generate_ingredient_brief_async(ingredient: str):
     """Generate ingredient brief asynchronously with progress updates"""
@@ -271,13 +579,22 @@ async def generate_ingredient_brief_async(ingredient: str):
         }
         
         # Import here to avoid circular imports
-        from backend.utils.rag import rag_analysis_with_progress
+        from backend.utils.rag import is_research_brief, rag_analysis_with_progress
         
         # Generate with progress updates
         summary = await rag_analysis_with_progress(ingredient, generation_progress)
+        if not is_research_brief(ingredient, summary):
+            # A regeneration that finds nothing keeps the brief it was refreshing; only its version moves on
+            previous = get_stored_summary(ingredient)
+            if previous and is_research_brief(ingredient, previous.summary):
+                summary = previous.summary
         
         # Store the result
-        store_summary_in_firestore(ingredient, summary)
+        with time_stage("brief.store"):
+            store_summary_in_firestore(ingredient, summary, prompt_version=PROMPT_VERSION)
+        brief_payloads.invalidate(ingredient)
+        brief_index.add_brief(ingredient)
+        ingredient_stats.mark_summarized(ingredient)
         
         # Update ingredient database if it exists
         try:
@@ -295,12 +612,20 @@ async def generate_ingredient_brief_async(ingredient: str):
             "summary": summary
         }
         
+    except DependencyUnavailable as e:
+        logger.warning(f"Skipped brief for {ingredient}: {e}")
+        generation_progress[ingredient] = {
+            "status": GenerationStatus.FAILED.value,
+            "message": "Research sources are temporarily unavailable, please try again later"
+        }
     except Exception as e:
         print(f"Error generating brief for {ingredient}: {e}")
         generation_progress[ingredient] = {
             "status": GenerationStatus.FAILED.value,
             "message": f"Failed to generate brief: {str(e)}"
         }
+    finally:
+        generation_admission.release()
 
 # Admin endpoints for ingredient management
 @app.post("/admin/categories")
@@ -325,12 +650,56 @@ async def create_category(request: CategoryCreateRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def listing_etag(version: int, request: Request) -> str:
+    """ETag for an admin listing: the watchlist version plus the query that shaped the page"""
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f'"wl{version}-{digest}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+def parse_projection(fields: Optional[str], include_summary: bool, allowed: List[str]) -> Optional[List[str]]:
+    """Turn ?fields=a,b and ?include_summary=false into a Firestore projection (None = all fields)"""
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        requested = list(allowed) if not include_summary else None
+    if requested is not None and not include_summary:
+        requested = [field for field in requested if field != "research_summary"]
+    return requested
+
 @app.get("/admin/categories")
-async def get_categories():
-    """Get all ingredient categories"""
+async def get_categories(
+    request: Request,
+    response: Response,
+    limit: int = Query(ADMIN_PAGE_SIZE, ge=1, le=ADMIN_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    severity_level: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get one page of ingredient categories"""
     try:
-        categories = await ingredient_service.get_all_categories()
-        return {"categories": [asdict(cat) for cat in categories]}
+        version = await ingredient_service.get_watchlist_version()
+        etag = listing_etag(version, request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        projection = parse_projection(fields, True, CATEGORY_FIELDS)
+        categories, next_cursor = await ingredient_service.list_categories(
+            limit, cursor=cursor, severity_level=severity_level, projection=projection
+        )
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return {"categories": categories, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -361,11 +730,32 @@ async def create_ingredient(request: IngredientCreateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/ingredients")
-async def get_ingredients():
-    """Get all ingredients"""
+async def get_ingredients(
+    request: Request,
+    response: Response,
+    limit: int = Query(ADMIN_PAGE_SIZE, ge=1, le=ADMIN_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    category_id: Optional[str] = None,
+    severity_level: Optional[str] = None,
+    fields: Optional[str] = None,
+    include_summary: bool = True
+):
+    """Get one page of ingredients; pass next_cursor back as ?cursor= for the following page"""
     try:
-        ingredients = await ingredient_service.get_all_ingredients()
-        return {"ingredients": [asdict(ing) for ing in ingredients]}
+        version = await ingredient_service.get_watchlist_version()
+        etag = listing_etag(version, request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        projection = parse_projection(fields, include_summary, INGREDIENT_FIELDS)
+        ingredients, next_cursor = await ingredient_service.list_ingredients(
+            limit, cursor=cursor, category_id=category_id, severity_level=severity_level, projection=projection
+        )
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return {"ingredients": ingredients, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -377,7 +767,143 @@ async def migrate_from_json():
         with open(file_path) as f:
             json_data = json.load(f)
         
-        await ingredient_service.migrate_from_json(json_data)
-        return {"message": "Migration completed successfully"}
+        summary = await ingredient_service.migrate_from_json(json_data)
+        return {"message": "Migration completed successfully", **summary}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/admin/import")
+async def bulk_import(request: Request, dry_run: bool = False):
+    """Bulk upsert categories and ingredients from a JSON or CSV body (Content-Type: text/csv)
+
+    Only new or changed records are written, in atomic batches of up to 500.
+    Pass ?dry_run=true to see what would change without writing anything.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "csv" in content_type:
+            payload = parse_csv_payload(body.decode("utf-8-sig"))
+        else:
+            payload = parse_json_payload(json.loads(body or b"{}"), ingredient_service._get_default_severity)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse import body: {e}")
+    
+    if payload.errors:
+        raise HTTPException(status_code=422, detail={"errors": payload.errors})
+    
+    try:
+        summary = await ingredient_service.bulk_upsert(payload, dry_run=dry_run)
+        return {"message": "Import completed successfully", **summary}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail={"errors": [str(e)]})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/admin/products/refresh")
+async def refresh_products(limit: int = Query(200, ge=1, le=5000), max_age_hours: float = Query(24, ge=0)):
+    """Refetch the most scanned products not fetched in `max_age_hours`, in bulk through OpenFoodFacts
+
+    Meant to be called on a schedule; only products whose data changed are rewritten.
+    """
+    try:
+        summary = await product_service.refresh_stale_products(limit=limit, max_age_hours=max_age_hours)
+        return {"message": "Product refresh completed", **summary}
+    except DependencyUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/products/{barcode}/changes")
+async def get_product_changes(barcode: str, limit: int = Query(20, ge=1, le=100)):
+    """Recent ingredient changes of a product, newest first"""
+    try:
+        return {"barcode": barcode, "changes": await product_service.get_change_history(barcode, limit)}
+    except DependencyUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/stats/ingredients")
+async def get_ingredient_stats(
+    limit: int = Query(50, ge=1, le=500),
+    order_by: str = Query("scans", pattern="^(scans|products)$"),
+    unsummarized_limit: int = Query(20, ge=0, le=200),
+):
+    """Most common flagged ingredients, their most frequent co-occurrences and the unsummarized queue
+
+    `scans` counts scans that flagged an ingredient; `products` counts distinct
+    products currently flagging it.
+    """
+    try:
+        await asyncio.to_thread(ingredient_stats.flush)
+        top = await asyncio.to_thread(ingredient_stats.top_ingredients, limit, order_by)
+        queue = await asyncio.to_thread(ingredient_stats.unsummarized, unsummarized_limit) if unsummarized_limit else []
+    except DependencyUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    ingredients = []
+    for entry in top:
+        cooccurrence = sorted(((other, count) for other, count in (entry.get("cooccurrence") or {}).items() if count > 0),
+                              key=lambda item: item[1], reverse=True)
+        ingredients.append({
+            "name": entry["name"],
+            "scans": entry.get("scans", 0),
+            "products": entry.get("products", 0),
+            "has_brief": bool(entry.get("has_brief")),
+            "last_scanned_at": entry.get("last_scanned_at"),
+            "top_cooccurring": [{"name": other, "products": count} for other, count in cooccurrence[:5]],
+        })
+    return {
+        "ingredients": ingredients,
+        "pairs": top_pairs(top),
+        "unsummarized": [{"name": entry["name"], "scans": entry.get("scans", 0), "products": entry.get("products", 0)}
+                         for entry in queue],
+    }
+
+@app.get("/admin/cache/summaries")
+async def get_summary_cache_stats():
+    """Hit counts and hit rate of this worker's summary cache"""
+    return summary_cache.stats()
+
+@app.post("/admin/briefs/pregenerate")
+async def pregenerate_briefs(limit: int = Query(5, ge=1, le=50)):
+    """Start briefs for the most scanned flagged ingredients that have none
+
+    Goes through the same admission control as user requests and stops at the
+    first rejection, so pre-generation only uses spare capacity.
+    """
+    for name in ("ncbi", "gemini"):
+        if not dependency(name).available:
+            raise DependencyUnavailable(name, "circuit open", dependency(name).breaker.retry_after())
+    if draining:
+        raise HTTPException(status_code=503, detail="Server is restarting, please try again shortly",
+                            headers={"Retry-After": "5"})
+    
+    await asyncio.to_thread(ingredient_stats.flush)
+    queue = await asyncio.to_thread(ingredient_stats.unsummarized, limit * 2)
+    
+    started, skipped = [], {}
+    for entry in queue:
+        if len(started) >= limit:
+            break
+        ingredient = entry["name"]
+        progress = generation_progress.get(ingredient)
+        if progress and progress["status"] in [GenerationStatus.SEARCHING_RESEARCH.value, GenerationStatus.GENERATING_SUMMARY.value]:
+            skipped[ingredient] = "already in progress"
+            continue
+        # Spelling variants are served the existing brief on request, no generation needed
+        match = brief_index.find(ingredient)
+        if match and match.canonical != ingredient:
+            skipped[ingredient] = f"reuses the brief for {match.canonical}"
+            continue
+        rejection = generation_admission.try_admit("pregenerate")
+        if rejection:
+            skipped[ingredient] = rejection
+            break
+        start_brief_generation(ingredient)
+        started.append(ingredient)
+    
+    return {"started": started, "skipped": skipped, "queue_length": len(queue)}
@@ -24,17 +24,15 @@ async def main():
         print(f"📄 Loaded {len(json_data)} categories from JSON")
         
         # Migrate data
-        await service.migrate_from_json(json_data)
+        summary = await service.migrate_from_json(json_data)
         
         print("✅ Migration completed successfully!")
         print("\n📊 Summary:")
         
         # Show what was migrated
-        categories = await service.get_all_categories()
-        ingredients = await service.get_all_ingredients()
-        
-        print(f"   - {len(categories)} categories created")
-        print(f"   - {len(ingredients)} ingredients created")
+        for kind in ("categories", "ingredients"):
+            stats = summary[kind]
+            print(f"   - {kind}: {stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged")
         
         print("\n🎯 Next steps:")
         print("   1. Test the /scan endpoint to ensure it works")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Refresh stale popular products from OpenFoodFacts in bulk
+Run on a schedule (e.g. hourly from cron); only products whose data changed are rewritten
+
+    PYTHONPATH=$(pwd) python -m backend.refresh_products --limit 500 --max-age-hours 24
+"""
+
+import argparse
+import asyncio
+from backend.utils.ingredient_service import IngredientService
+from backend.utils.products import REFRESH_MAX_AGE_HOURS, ProductService
+
+async def main():
+    parser = argparse.ArgumentParser(description="Refetch the most scanned products whose stored copy is stale")
+    parser.add_argument("--limit", type=int, default=200, help="how many of the most scanned products to consider")
+    parser.add_argument("--max-age-hours", type=float, default=REFRESH_MAX_AGE_HOURS,
+                        help="refetch products last fetched longer ago than this")
+    args = parser.parse_args()
+
+    print(f"🚀 Refreshing up to {args.limit} popular products older than {args.max_age_hours:g}h...")
+    
+    service = ProductService(IngredientService())
+    summary = await service.refresh_stale_products(limit=args.limit, max_age_hours=args.max_age_hours)
+    service.stats.flush()
+    
+    print("✅ Refresh completed!")
+    print("\n📊 Summary:")
+    print(f"   - {summary['checked']} stale products in {summary['batches']} OpenFoodFacts requests")
+    print(f"   - {summary['changed']} changed, {summary['unchanged']} unchanged")
+    if summary["missing"] or summary["failed"]:
+        print(f"   - {summary['missing']} no longer on OpenFoodFacts, {summary['failed']} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
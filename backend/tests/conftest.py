@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pytest
+
+from backend.benchmarks.fake_firestore import FakeFirestoreClient, install_fake_firestore
+
+# Modules bind backend.firebase_init.db when imported, so the in-memory stand-in is registered
+# once, before any test module is collected; each test then gets its own empty client below
+install_fake_firestore()
+
+
+class NullStats:
+    """Stands in for ingredient_stats where a test does not look at flag statistics"""
+
+    def record(self, names, previous=None, scanned=True):
+        pass
+
+
+@pytest.fixture
+def firestore_db():
+    """An empty in-memory Firestore for one test"""
+    return FakeFirestoreClient()
+
+
+@pytest.fixture
+def ingredient_service(firestore_db):
+    from backend.utils.ingredient_service import IngredientService
+    service = IngredientService()
+    service.db = firestore_db
+    return service
+
+
+@pytest.fixture
+def product_service(ingredient_service, firestore_db):
+    from backend.utils.products import ProductService
+    service = ProductService(ingredient_service, stats=NullStats())
+    service.db = firestore_db
+    return service
+
+
+@pytest.fixture
+def stats(firestore_db):
+    from backend.utils.ingredient_stats import IngredientStats
+    stats = IngredientStats()
+    stats.db = firestore_db
+    return stats
@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.utils.ingredient_service import WATCHLIST_META_COLLECTION, WATCHLIST_META_DOCUMENT
+
+INGREDIENTS = [
+    ("colors_red_40", "red 40", "colors", "high", True),
+    ("colors_yellow_5", "yellow 5", "colors", "moderate", True),
+    ("colors_blue_1", "blue 1", "colors", "moderate", False),
+    ("preservatives_bha", "bha", "preservatives", "high", True),
+    ("preservatives_sodium_nitrite", "sodium nitrite", "preservatives", "high", True),
+]
+
+
+@pytest.fixture
+def client(firestore_db, monkeypatch):
+    import backend.main as main
+    monkeypatch.setattr(main.ingredient_service, "db", firestore_db)
+    for category_id, severity in (("colors", "moderate"), ("preservatives", "high")):
+        firestore_db.collection("ingredient_categories").document(category_id).set({
+            "id": category_id, "name": category_id.title(), "description": "", "severity_level": severity,
+            "is_active": True,
+        })
+    for ingredient_id, name, category_id, severity, active in INGREDIENTS:
+        firestore_db.collection("ingredients").document(ingredient_id).set({
+            "id": ingredient_id, "name": name, "aliases": [], "category_id": category_id,
+            "severity_level": severity, "health_concerns": [], "environmental_impact": None,
+            "research_summary": f"A long research brief about {name}", "is_active": active,
+        })
+    firestore_db.collection(WATCHLIST_META_COLLECTION).document(WATCHLIST_META_DOCUMENT).set({"version": 3})
+    return TestClient(main.app)
+
+
+def test_cursor_pages_through_active_ingredients(client):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/admin/ingredients", params=params).json()
+        assert len(body["ingredients"]) <= 2
+        ids += [ingredient["id"] for ingredient in body["ingredients"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 2
+    assert ids == sorted(entry[0] for entry in INGREDIENTS if entry[4])
+
+
+def test_category_and_severity_filters(client):
+    body = client.get("/admin/ingredients", params={"category_id": "preservatives", "severity_level": "high"}).json()
+    assert [ingredient["name"] for ingredient in body["ingredients"]] == ["bha", "sodium nitrite"]
+    body = client.get("/admin/ingredients", params={"category_id": "colors", "severity_level": "high"}).json()
+    assert [ingredient["name"] for ingredient in body["ingredients"]] == ["red 40"]
+    body = client.get("/admin/categories", params={"severity_level": "high"}).json()
+    assert [category["id"] for category in body["categories"]] == ["preservatives"]
+
+
+def test_projection_drops_summaries_and_rejects_unknown_fields(client):
+    body = client.get("/admin/ingredients", params={"include_summary": "false"}).json()
+    assert body["ingredients"] and all("research_summary" not in ingredient for ingredient in body["ingredients"])
+    assert "aliases" in body["ingredients"][0]
+
+    body = client.get("/admin/ingredients", params={"fields": "name,severity_level"}).json()
+    assert set(body["ingredients"][0]) == {"id", "name", "severity_level"}
+
+    response = client.get("/admin/ingredients", params={"fields": "name,price"})
+    assert response.status_code == 400 and "price" in response.json()["detail"]
+
+
+def test_matching_etag_is_not_modified_until_the_watchlist_changes(client, firestore_db):
+    response = client.get("/admin/ingredients", params={"limit": 2})
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and response.headers["Cache-Control"] == "no-cache"
+
+    response = client.get("/admin/ingredients", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.headers["ETag"] == etag
+    # The same watchlist viewed through another query is a different representation
+    assert client.get("/admin/ingredients", params={"limit": 3}, headers={"If-None-Match": etag}).status_code == 200
+
+    firestore_db.collection(WATCHLIST_META_COLLECTION).document(WATCHLIST_META_DOCUMENT).set({"version": 4})
+    response = client.get("/admin/ingredients", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
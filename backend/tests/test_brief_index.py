@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pytest
+
+from backend.utils.brief_index import BriefIndex, normalize_name
+
+
+@pytest.fixture
+def index():
+    index = BriefIndex()
+    index.add_brief("monosodium glutamate")
+    index.add_brief("sodium nitrite")
+    index.add_brief("sodium sulfite")
+    index.add_brief("partially hydrogenated soybean oil")
+    index.add_brief("yellow 5")
+    index.add_brief("red 40", aliases=["allura red"])
+    return index
+
+
+def test_normalize_name_folds_labels_and_spellings():
+    assert normalize_name("FD&C Red No. 40") == "red 40"
+    assert normalize_name("Caramel Colour") == "caramel color"
+
+
+def test_spelling_variants_reuse_the_canonical_brief(index):
+    match = index.find("mono-sodium glutamate")
+    assert match is not None and match.canonical == "monosodium glutamate"
+    assert index.find("FD&C Red No. 40").canonical == "red 40"
+    assert index.find("Sodium Sulphite").canonical == "sodium sulfite"
+
+
+def test_curated_aliases_link_to_the_canonical_brief(index):
+    assert index.find("allura red").canonical == "red 40"
+    assert index.find("Red Allura").canonical == "red 40"
+    # Only curated aliases link names without words in common; "allura red ac" needs its own alias
+    assert index.find("allura red ac") is None
+    index.add("allura red ac", "red 40")
+    assert index.find("Allura Red AC").canonical == "red 40"
+
+
+def test_distinct_additives_are_not_linked(index):
+    assert index.find("sodium nitrate") is None
+    assert index.find("yellow 6") is None
+    assert index.find("sodium bisulfite") is None
+    assert index.find("hydrogenated soybean oil") is None
+
+
+def test_a_name_with_its_own_brief_keeps_it(index):
+    index.add("allura red", "allura red")
+    index.add("allura red", "red 40")
+    index.add("red 40", "allura red")
+    assert index.find("allura red").canonical == "allura red"
+    assert index.find("red 40").canonical == "red 40"
+
+
+def test_word_order_and_word_breaks_do_not_matter(index):
+    assert index.find("glutamate monosodium").canonical == "monosodium glutamate"
+    assert index.find("sodium-nitrite").canonical == "sodium nitrite"
+    assert index.find("") is None
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+
+import pytest
+
+from backend.utils.prompts import PROMPT_VERSION
+from backend.utils.rag import no_research_found
+from backend.utils.summary_cache import SUMMARIES_COLLECTION
+
+
+@pytest.fixture
+def main(firestore_db, ingredient_service, stats, monkeypatch):
+    import backend.main as main
+    import backend.utils.firestore as firestore
+    monkeypatch.setattr(firestore, "db", firestore_db)
+    monkeypatch.setattr(main, "ingredient_service", ingredient_service)
+    monkeypatch.setattr(main, "ingredient_stats", stats)
+    return main
+
+
+def _regenerate(main, monkeypatch, ingredient, result):
+    async def rag_analysis_with_progress(name, progress):
+        return result
+    monkeypatch.setattr("backend.utils.rag.rag_analysis_with_progress", rag_analysis_with_progress)
+    main.generation_admission.try_admit("regenerate")
+    asyncio.run(main.generate_ingredient_brief_async(ingredient))
+    return main.get_stored_summary(ingredient)
+
+
+def test_regeneration_that_finds_nothing_keeps_the_old_brief(main, firestore_db, monkeypatch):
+    ingredient = "regenerated carrageenan"
+    firestore_db.collection(SUMMARIES_COLLECTION).document(ingredient).set(
+        {"summary": "Carrageenan brief", "prompt_version": "brief-v1"})
+    assert not main.get_stored_summary(ingredient).current
+
+    stored = _regenerate(main, monkeypatch, ingredient, no_research_found(ingredient))
+    assert stored.summary == "Carrageenan brief" and stored.current
+    assert firestore_db.collection(SUMMARIES_COLLECTION).document(ingredient).get().to_dict()["prompt_version"] \
+        == PROMPT_VERSION
+
+    stored = _regenerate(main, monkeypatch, ingredient, "  ")
+    assert stored.summary == "Carrageenan brief"
+
+    stored = _regenerate(main, monkeypatch, ingredient, "New carrageenan brief")
+    assert stored.summary == "New carrageenan brief"
+
+
+def test_first_brief_without_research_stores_the_placeholder(main, monkeypatch):
+    ingredient = "regenerated guar gum"
+    stored = _regenerate(main, monkeypatch, ingredient, no_research_found(ingredient))
+    assert stored.summary == no_research_found(ingredient) and stored.current
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+
+import pytest
+
+from backend.utils.ingredient_import import parse_csv_payload, parse_json_payload
+
+
+def test_legacy_watchlist_shape_only_sets_defaults_on_create():
+    payload = parse_json_payload({"Food Dyes": ["Red 40"]}, lambda name: "high")
+    assert not payload.errors
+    category, = payload.categories
+    ingredient, = payload.ingredients
+    assert category.id == "food_dyes"
+    assert ingredient.id == "food_dyes_red_40"
+    assert ingredient.values == {"name": "red 40", "category_id": "food_dyes"}
+    assert ingredient.defaults["severity_level"] == "high"
+    assert ingredient.defaults["aliases"] == ["Red 40"]
+
+
+def test_csv_rows_create_implied_categories_and_split_lists():
+    payload = parse_csv_payload(
+        "name,category,aliases,severity_level\n"
+        "sodium tripolyphosphate,Phosphates,stpp;E451,high\n"
+    )
+    assert not payload.errors
+    ingredient, = payload.ingredients
+    assert ingredient.values["aliases"] == ["stpp", "E451"]
+    assert ingredient.values["category_id"] == "phosphates"
+    category, = payload.categories
+    assert category.values == {} and category.defaults["name"] == "Phosphates"
+
+
+def test_invalid_rows_are_reported():
+    payload = parse_json_payload({"ingredients": [
+        {"name": "a", "category_id": "c", "severity_level": "extreme"},
+        {"name": "b"},
+        {"name": "a", "category_id": "c"},
+    ]})
+    assert len(payload.errors) == 3
+
+
+def test_malformed_json_records_are_reported_not_raised():
+    for data in ({"ingredients": ["sugar"]}, {"ingredients": [{"name": 5, "category_id": "c"}]},
+                 {"categories": {"a": 1}}, {"ingredients": [{"name": "a", "category_id": "c", "aliases": [1]}]},
+                 {"Food Dyes": ["Red 40", None]}):
+        payload = parse_json_payload(data)
+        assert payload.errors and not payload.ingredients, data
+
+
+def test_batches_committed_before_a_failure_bump_the_watchlist_version(ingredient_service, monkeypatch):
+    service = ingredient_service
+    monkeypatch.setattr("backend.utils.ingredient_service.MAX_BATCH_WRITES", 1)
+    make_batch = service.db.batch
+    commits = []
+
+    def failing_batch():
+        batch = make_batch()
+        commit = batch.commit
+
+        def commit_once():
+            if commits:
+                raise RuntimeError("deadline exceeded")
+            commits.append(commit())
+        batch.commit = commit_once
+        return batch
+
+    service.db.batch = failing_batch
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.bulk_upsert(parse_json_payload({"Food Dyes": ["Red 40"]})))
+    assert len(commits) == 1
+    assert asyncio.run(service.get_watchlist_version()) == 1
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
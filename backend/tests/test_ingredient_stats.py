@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.utils.ingredient_stats import stats_document_id, top_pairs
+
+
+def test_rescans_only_count_scans(stats):
+    stats.record(["Red 40", "aspartame"])
+    stats.record(["red 40", "aspartame"], previous=["red 40", "aspartame"])
+    stats.flush()
+
+    red = stats.db.collection("ingredient_stats").document("red 40").get().to_dict()
+    assert red["scans"] == 2
+    assert red["products"] == 1
+    assert red["cooccurrence"] == {"aspartame": 1}
+
+
+def test_changed_flag_set_moves_products_and_pairs(stats):
+    stats.record(["red 40", "aspartame"])
+    stats.record(["red 40", "sucralose"], previous=["red 40", "aspartame"], scanned=False)
+    stats.flush()
+
+    docs = {doc.id: doc.to_dict() for doc in stats.db.collection("ingredient_stats").stream()}
+    # Deltas that cancel out before a flush are never written
+    assert docs["aspartame"].get("products", 0) == 0
+    assert docs["red 40"]["scans"] == 1
+    assert docs["red 40"]["cooccurrence"] == {"sucralose": 1}
+    assert top_pairs(docs.values()) == [{"ingredients": ["red 40", "sucralose"], "products": 1}]
+
+
+def test_unsummarized_queue_skips_ingredients_with_a_brief(stats):
+    stats.record(["red 40", "aspartame"])
+    stats.record(["red 40"])
+    stats.flush()
+    stats.db.collection("ingredient_summaries").document("aspartame").set({"summary": "..."})
+
+    assert [entry["name"] for entry in stats.unsummarized()] == ["red 40"]
+    assert stats.db.collection("ingredient_stats").document("aspartame").get().to_dict()["has_brief"] is True
+
+
+def test_names_with_a_slash_are_stored_under_a_hashed_id(stats):
+    label = "emulsifier (soy lecithin and/or sunflower lecithin)"
+    stats.record([label, "red 40"])
+    assert stats.flush() == 2
+    assert stats.flush() == 0
+
+    doc = stats.db.collection("ingredient_stats").document(stats_document_id(label)).get().to_dict()
+    assert doc["name"] == label and doc["scans"] == 1
+    # No brief can be stored under such a name, so it is not queued for one
+    assert [entry["name"] for entry in stats.unsummarized()] == ["red 40"]
+    stats.mark_summarized(label)
+    assert stats.db.collection("ingredient_stats").document(stats_document_id(label)).get().to_dict()["has_brief"]
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__]))
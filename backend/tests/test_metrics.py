@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+
+import pytest
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY
+
+from backend.utils.metrics import (
+    begin_request, end_request, record_cache, render_metrics, time_stage, track_external
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_stages_are_logged_only_inside_a_request():
+    with time_stage("test.outside"):
+        pass
+
+    token = begin_request()
+    with time_stage("test.inside"):
+        pass
+    with time_stage("test.inside"):
+        pass
+    timings = end_request(token)
+    assert set(timings) == {"test.inside"} and timings["test.inside"] >= 0
+    assert sample("vireo_stage_latency_seconds_count", stage="test.inside") == 2
+
+
+def test_external_errors_are_counted_and_reraised():
+    labels = {"dependency": "test-dep", "operation": "get"}
+    with track_external("test-dep", "get"):
+        pass
+    with pytest.raises(RuntimeError):
+        with track_external("test-dep", "get"):
+            raise RuntimeError("upstream error")
+    assert sample("vireo_external_calls_total", **labels) == 2
+    assert sample("vireo_external_errors_total", **labels) == 1
+    assert sample("vireo_external_call_latency_seconds_count", **labels) == 2
+
+
+def test_cache_hit_ratio_covers_every_lookup():
+    for hit in (True, True, False, True):
+        record_cache("test-cache", hit)
+    assert sample("vireo_cache_hit_ratio", cache="test-cache") == 0.75
+    assert sample("vireo_cache_requests_total", cache="test-cache", result="miss") == 1
+
+
+def test_calls_moved_to_a_thread_keep_the_request_timings():
+    def fetch():
+        with track_external("test-thread", "fetch"):
+            pass
+
+    async def request():
+        token = begin_request()
+        # asyncio.to_thread copies contextvars; a bare run_in_executor would lose the request's timings
+        await asyncio.to_thread(fetch)
+        return end_request(token)
+
+    assert "test-thread.fetch" in asyncio.run(request())
+
+
+def test_multiprocess_metrics_are_aggregated_from_the_shared_directory(tmp_path, monkeypatch):
+    body, content_type = render_metrics()
+    assert content_type == CONTENT_TYPE_LATEST and b"vireo_cache_hit_ratio" in body
+
+    # Under gunicorn each worker writes its own files; with none written yet the scrape is simply empty
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    body, content_type = render_metrics()
+    assert content_type == CONTENT_TYPE_LATEST and b"vireo_cache_hit_ratio" not in body
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
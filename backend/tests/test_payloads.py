@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import gzip
+from datetime import datetime
+
+import brotli
+import orjson
+
+from backend.utils.payloads import PayloadCache, encode_payload, negotiate_encoding
+
+
+def test_negotiation_prefers_brotli_and_honours_q_zero():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_payloads_carry_matching_compressed_variants():
+    content = {"summary": "Sodium nitrite is used to cure meats. " * 100, "at": datetime(2024, 1, 1)}
+    payload = encode_payload(content)
+    assert orjson.loads(payload.body)["at"] == "2024-01-01T00:00:00"
+    assert gzip.decompress(payload.gzip) == payload.body
+    assert brotli.decompress(payload.br) == payload.body
+    assert len(payload.br) < len(payload.body)
+
+    assert encode_payload({"summary": None}).gzip is None
+
+
+def test_fingerprint_change_is_a_miss():
+    cache = PayloadCache("test_payload", max_entries=2)
+    cache.put("a", {"v": 1}, "v1")
+    assert cache.get("a", "v1") is not None
+    assert cache.get("a", "v2") is None
+    assert cache.get("a", "v1") is None
+
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key})
+    assert len(cache) == 2 and cache.get("a") is None
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__]))
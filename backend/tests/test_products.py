@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from backend.utils import products
+from backend.utils.products import diff_ingredients, ingredient_tokens, ingredients_hash
+
+
+def test_tokens_match_flagging_normalization():
+    assert ingredient_tokens("Water, Sugar ,, Red 40 ") == ["water", "sugar", "red 40"]
+    assert ingredient_tokens(None) == []
+
+
+def test_hash_ignores_order_and_duplicates():
+    assert ingredients_hash(["water", "sugar"]) == ingredients_hash(["sugar", "water", "water"])
+    assert ingredients_hash(["water", "sugar"]) != ingredients_hash(["water", "sugar", "salt"])
+
+
+def test_diff_lists_added_and_removed_tokens():
+    change = diff_ingredients(["water", "sugar", "salt"], ["water", "sugar", "sodium nitrite"])
+    assert change.added == ["sodium nitrite"]
+    assert change.removed == ["salt"]
+    assert change.previous_hash != change.hash
+
+
+def test_flag_state_keeps_only_flagged_tokens(product_service):
+    service = product_service
+    flags, _ = asyncio.run(service.record_fetch("1", {"ingredients_text": "Water, Sodium Benzoate"}, None))
+    stored = service.db.collection("products").document("1").get().to_dict()
+    assert stored["flag_state"] == {"watchlist_version": 0, "tokens": ["sodium benzoate"]}
+    assert service._known_flags(stored, 0) == {"water": None}
+    assert [flag.ingredient_name for flag in asyncio.run(service.stored_scan(stored))] == ["Sodium Benzoate"]
+
+
+def test_refresh_pages_past_fresh_products_and_survives_a_bad_one(product_service, monkeypatch):
+    service = product_service
+    now = datetime.now(timezone.utc)
+    for barcode, scans, age in [("fresh", 9, 1), ("stale", 5, 48), ("broken", 3, 48), ("never", 1, None)]:
+        service.db.collection("products").document(barcode).set({
+            "scan_count": scans, "ingredients_text": "water",
+            **({"last_fetched_at": now - timedelta(hours=age)} if age else {}),
+        })
+    monkeypatch.setattr(products, "REFRESH_PAGE_SIZE", 1)
+    monkeypatch.setattr(products, "fetch_off_products", lambda barcodes: {
+        barcode: {"code": barcode, "ingredients_text": "water"} for barcode in barcodes})
+    record_fetch = service.record_fetch
+
+    async def failing_record_fetch(barcode, *args, **kwargs):
+        if barcode == "broken":
+            raise RuntimeError("write failed")
+        return await record_fetch(barcode, *args, **kwargs)
+
+    service.record_fetch = failing_record_fetch
+    summary = asyncio.run(service.refresh_stale_products(limit=3, max_age_hours=24))
+    assert summary["checked"] == 3 and summary["failed"] == 1 and summary["unchanged"] == 2
+    assert "last_fetched_at" in service.db.collection("products").document("never").get().to_dict()
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.utils.prompts import PROMPT_VERSION, build_brief_prompt, estimate_tokens, split_sentences
+
+FILLER = "Participants were recruited from three regional clinics over two years. "
+
+
+def test_prompt_stays_within_budget_however_long_the_abstracts():
+    papers = [{"title": f"Study {i} of aspartame", "abstract": FILLER * 200} for i in range(5)]
+    prompt = build_brief_prompt("aspartame", papers, budget=800)
+    assert prompt.tokens <= 800
+    assert prompt.version == PROMPT_VERSION
+    assert prompt.sentences_kept < prompt.sentences_total
+    # Every paper keeps its title and at least one sentence
+    assert all(f"Study {i} of aspartame:\nParticipants" in prompt.text for i in range(5))
+
+
+def test_ingredient_and_outcome_sentences_are_kept_first():
+    abstract = (FILLER * 5 + "Aspartame intake was associated with increased cancer risk in mice. "
+                + FILLER * 5 + "We conclude that typical aspartame exposure is safe for adults.")
+    prompt = build_brief_prompt("aspartame", [{"title": "Aspartame review", "abstract": abstract}],
+                                budget=estimate_tokens(build_brief_prompt("aspartame", []).text) + 45)
+    assert "associated with increased cancer risk" in prompt.text
+    assert "typical aspartame exposure is safe" in prompt.text
+    assert "Participants" not in prompt.text
+    # Kept sentences stay in abstract order
+    assert prompt.text.index("cancer risk") < prompt.text.index("is safe for adults")
+
+
+def test_short_abstracts_pass_through_unchanged():
+    abstract = "Sucralose did not affect glucose. Results suggest it is safe."
+    assert split_sentences(abstract) == ["Sucralose did not affect glucose.", "Results suggest it is safe."]
+    prompt = build_brief_prompt("sucralose", [{"title": "Sucralose trial", "abstract": abstract}])
+    assert f"Sucralose trial:\n{abstract}" in prompt.text
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import time
+
+import pytest
+
+from backend.utils.resilience import CLOSED, HALF_OPEN, OPEN, Dependency, DependencyUnavailable, GenerationAdmission
+
+
+def failing_call(dep):
+    with pytest.raises(RuntimeError):
+        with dep.guard():
+            raise RuntimeError("upstream error")
+
+
+def test_circuit_opens_after_threshold_and_fails_fast():
+    dep = Dependency("test-open", max_concurrency=2, failure_threshold=2, reset_timeout=60)
+    failing_call(dep)
+    assert dep.breaker.state == CLOSED
+    failing_call(dep)
+    assert dep.breaker.state == OPEN
+
+    with pytest.raises(DependencyUnavailable):
+        with dep.guard():
+            pytest.fail("call should not run while the circuit is open")
+
+
+def test_half_open_probe_closes_circuit_on_success():
+    dep = Dependency("test-probe", max_concurrency=2, failure_threshold=1, reset_timeout=0)
+    failing_call(dep)
+    assert dep.breaker.state == HALF_OPEN
+
+    with dep.guard():
+        pass
+    assert dep.breaker.state == CLOSED
+
+
+def test_bulkhead_rejects_when_full():
+    dep = Dependency("test-bulkhead", max_concurrency=1, acquire_timeout=0.01)
+    with dep.guard():
+        with pytest.raises(DependencyUnavailable):
+            with dep.guard():
+                pass
+    # A full bulkhead is not the dependency's fault
+    assert dep.breaker.state == CLOSED
+
+
+def test_full_bulkhead_never_blocks_the_event_loop():
+    dep = Dependency("test-loop", max_concurrency=1, acquire_timeout=5)
+
+    async def guarded_while_full():
+        started = time.monotonic()
+        with dep.guard():
+            with pytest.raises(DependencyUnavailable):
+                with dep.guard():
+                    pass
+        return time.monotonic() - started
+
+    assert asyncio.run(guarded_while_full()) < 1
+
+
+def test_generation_admission_caps_in_flight():
+    admission = GenerationAdmission(max_in_flight=1, per_client_limit="100/minute")
+    assert admission.try_admit("client-a") is None
+    assert admission.try_admit("client-b") is not None
+    admission.release()
+    assert admission.try_admit("client-b") is None
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.utils.payloads import PayloadCache
+from backend.utils.shared_cache import SharedCache, SharedDict
+
+
+def test_values_are_visible_through_another_connection(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer, reader = SharedCache(path), SharedCache(path)
+    writer.put("watchlist_index", "current", {"sodium nitrite": 1}, fingerprint="7")
+    assert reader.get("watchlist_index", "current", "7") == {"sodium nitrite": 1}
+    assert reader.get("watchlist_index", "current", "8") is None
+
+    writer.put("brief_payload", "msg", "expired", ttl=-1)
+    assert reader.get("brief_payload", "msg") is None
+
+
+def test_payload_cache_falls_back_to_the_shared_tier(tmp_path):
+    shared = SharedCache(str(tmp_path / "cache.sqlite"))
+    first, second = PayloadCache("p", shared=shared), PayloadCache("p", shared=shared)
+    stored = first.put("0001", {"product": {"name": "Cola"}}, "v1")
+    assert second.get("0001", "v1").body == stored.body
+
+    first.invalidate("0001")
+    assert PayloadCache("p", shared=shared).get("0001", "v1") is None
+
+
+def test_shared_dict_works_with_sharing_disabled():
+    progress = SharedDict(SharedCache(""), "generation_progress", ttl=60)
+    progress["msg"] = {"status": "searching_research"}
+    assert "msg" in progress and progress["msg"]["status"] == "searching_research"
+    assert progress.get("other", {"status": "not_started"}) == {"status": "not_started"}
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import time
+from datetime import datetime, timezone
+
+from backend.utils.shared_cache import SharedCache
+from backend.utils.prompts import PROMPT_VERSION
+from backend.utils.summary_cache import SUMMARIES_COLLECTION, StoredSummary, SummaryCache, stored_summary
+
+
+def test_misses_are_cached_briefly_and_hits_longer():
+    cache = SummaryCache(negative_ttl=0.05, shared=SharedCache(""))
+    cached, _, epoch = cache.lookup("aspartame")
+    assert not cached
+    cache.fill("aspartame", None, epoch)
+    assert cache.lookup("aspartame")[:2] == (True, None)
+
+    time.sleep(0.06)
+    cached, _, epoch = cache.lookup("aspartame")
+    assert not cached
+    cache.fill("aspartame", StoredSummary("Aspartame brief"), epoch)
+    time.sleep(0.06)
+    assert cache.lookup("aspartame")[:2] == (True, StoredSummary("Aspartame brief"))
+    assert cache.stats()["negative_hits"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_a_read_that_raced_a_write_is_not_cached(tmp_path):
+    shared = SharedCache(str(tmp_path / "cache.sqlite"))
+    cache = SummaryCache(shared=shared)
+    _, _, epoch = cache.lookup("red 40")
+    cache.put("red 40", StoredSummary("Red 40 brief"))
+    # The read started before the write and saw no summary
+    cache.fill("red 40", None, epoch)
+    assert cache.lookup("red 40")[:2] == (True, StoredSummary("Red 40 brief"))
+    # Written through to the shared tier for the other workers
+    assert SummaryCache(shared=shared).lookup("red 40")[:2] == (True, StoredSummary("Red 40 brief"))
+
+
+def test_listener_replaces_entries_written_elsewhere(firestore_db, tmp_path):
+    db = firestore_db
+    shared = SharedCache(str(tmp_path / "cache.sqlite"))
+    cache = SummaryCache(shared=shared)
+    assert cache.listen(db)
+    shared.put(cache.name, "sucralose", StoredSummary("Old sucralose brief"))
+    _, _, epoch = cache.lookup("sucralose")
+    cache.fill("sucralose", None, epoch)
+
+    # Written from another host, so only the listener can refresh this host's shared tier
+    db.collection(SUMMARIES_COLLECTION).document("sucralose").set(
+        {"summary": "Sucralose brief", "updated_at": datetime.now(timezone.utc)})
+    assert cache.lookup("sucralose")[:2] == (True, StoredSummary("Sucralose brief"))
+    assert SummaryCache(shared=shared).lookup("sucralose")[:2] == (True, StoredSummary("Sucralose brief"))
+
+    db.collection(SUMMARIES_COLLECTION).document("sucralose").delete()
+    assert not cache.lookup("sucralose")[0]
+    assert not SummaryCache(shared=shared).lookup("sucralose")[0]
+    cache.stop()
+
+
+def test_briefs_from_older_prompts_are_not_current():
+    assert stored_summary({"summary": "Red 40 brief", "prompt_version": PROMPT_VERSION}).current
+    assert not stored_summary({"summary": "Red 40 brief", "prompt_version": "brief-v1"}).current
+    # Briefs stored before prompts were versioned
+    assert not stored_summary({"summary": "Red 40 brief"}).current
+    assert stored_summary({"summary": ""}) is None
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from backend.utils.ingredient_service import (
+    AUTO_FLAG_PATTERNS, WATCHLIST_META_COLLECTION, WATCHLIST_META_DOCUMENT, Ingredient, IngredientCategory,
+    IngredientService, SnapshotEntries, WatchlistIndex
+)
+from backend.utils.watchlist_snapshot import WatchlistSnapshot, build_snapshot, snapshot_etag, write_snapshot
+
+
+def _index(version=4):
+    now = datetime.now()
+    preservatives = IngredientCategory("preservatives", "Preservatives", "", "high", True, now, now)
+    nitrite = Ingredient("preservatives_sodium_nitrite", "sodium nitrite", ["e250"], "preservatives", "",
+                         ["nitrosamines"], None, "Linked to processed meat risks", True, now, now)
+    color = Ingredient("colors_red_40", "red 40", [], "colors", "moderate", [], None, None, True, now, now)
+    return WatchlistIndex(version=version, entries={
+        "sodium nitrite": (nitrite, preservatives), "e250": (nitrite, preservatives), "red 40": (color, None),
+    })
+
+
+def test_snapshot_round_trips_the_compiled_watchlist():
+    index = _index()
+    snapshot = WatchlistSnapshot(build_snapshot(index.version, index.entries, AUTO_FLAG_PATTERNS))
+    assert snapshot.version == 4 and len(snapshot) == 3
+    assert list(snapshot.names()) == ["e250", "red 40", "sodium nitrite"]
+
+    alias = snapshot.lookup("e250")
+    assert alias.name == "sodium nitrite" and alias.health_concerns == ["nitrosamines"]
+    assert alias.category.name == "Preservatives" and alias.category.severity_level == "high"
+    # Only whether a brief exists travels in the snapshot; its text stays in Firestore
+    assert alias.has_research_summary and not snapshot.lookup("red 40").has_research_summary
+    assert b"processed meat" not in snapshot.data
+    assert snapshot.lookup("red 40").category is None
+    assert snapshot.lookup("water") is None
+    assert snapshot.rules == AUTO_FLAG_PATTERNS
+    assert snapshot.normalization["separator"] == ","
+
+
+def test_snapshot_is_deterministic_and_checked():
+    index = _index()
+    data = build_snapshot(index.version, index.entries, AUTO_FLAG_PATTERNS)
+    assert data == build_snapshot(index.version, dict(reversed(list(index.entries.items()))), AUTO_FLAG_PATTERNS)
+    assert snapshot_etag(data) != snapshot_etag(build_snapshot(5, index.entries, AUTO_FLAG_PATTERNS))
+
+    corrupted = bytearray(data)
+    corrupted[-1] ^= 0xFF
+    with pytest.raises(ValueError):
+        WatchlistSnapshot(bytes(corrupted))
+
+
+def test_service_flags_from_a_mapped_snapshot_file(ingredient_service, tmp_path):
+    index = _index()
+    path = str(tmp_path / "watchlist.snapshot")
+    write_snapshot(path, build_snapshot(index.version, index.entries, AUTO_FLAG_PATTERNS))
+
+    service = ingredient_service
+    service.db.collection(WATCHLIST_META_COLLECTION).document(WATCHLIST_META_DOCUMENT).set({"version": index.version})
+    assert service.load_snapshot(path)
+    flags = asyncio.run(service.flag_ingredients_in_text("Water, E250, Red 40, Sodium Benzoate"))
+    # Firestore confirmed the snapshot's version, so it is still served from the mapped file
+    assert isinstance(service._index.entries, SnapshotEntries)
+    assert [(flag.ingredient_name, flag.category, flag.severity) for flag in flags] == [
+        ("E250", "Preservatives", "high"), ("Red 40", "Unknown", "moderate"),
+        ("Sodium Benzoate", "Auto-Flagged", "moderate"),
+    ]
+    assert flags[0].has_research_summary and not flags[1].has_research_summary
+
+    write_snapshot(path, build_snapshot(index.version, index.entries, ["only-this"]))
+    assert not IngredientService().load_snapshot(path)
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,116 @@
+"""
+Index of ingredient names that already have a research brief
+Lets spelling variants ("mono-sodium glutamate", "FD&C Red No. 40") and curated
+watchlist aliases of a summarized ingredient reuse the existing canonical brief
+instead of paying for another PubMed + Gemini generation. Names are matched on
+their normalized words only, never on string similarity, so "sodium bisulfite"
+never borrows the brief for "sodium sulfite"; pairs with no words in common
+("potassium sorbate" / "sorbic acid") link through curated aliases
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+# Regional spellings folded onto one form
+_SPELLINGS = {
+    "colour": "color",
+    "flavour": "flavor",
+    "sulphite": "sulfite",
+    "sulphites": "sulfites",
+    "sulphate": "sulfate",
+    "sulphur": "sulfur",
+    "aluminium": "aluminum",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Fold casing, punctuation, FD&C prefixes and regional spellings"""
+    text = name.lower()
+    text = re.sub(r"fd\s*&\s*c|fd and c", " ", text)
+    text = re.sub(r"\bno\.?\s*(?=\d)", " ", text)
+    text = re.sub(r"[^a-z0-9]+", " ", text).strip()
+    return " ".join(_SPELLINGS.get(word, word) for word in text.split())
+
+
+def name_keys(name: str) -> Tuple[str, str]:
+    """Lookup keys of a name: its set of words, and its letters with the word breaks removed
+
+    The first ignores word order ("red 40" / "40 red"), the second where words
+    are split ("monosodium" / "mono sodium").
+    """
+    words = normalize_name(name).split()
+    return " ".join(sorted(set(words))), "".join(words)
+
+
+@dataclass
+class BriefMatch:
+    """A stored brief that can serve a requested ingredient"""
+    canonical: str
+    matched_name: str
+
+
+class BriefIndex:
+    """Normalized name keys -> the name whose brief serves them"""
+
+    def __init__(self):
+        self._by_words: Dict[str, Tuple[str, str]] = {}
+        self._by_letters: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._by_words)
+
+    def add(self, name: str, canonical: str) -> None:
+        """Index `name` as a way of referring to the brief stored under `canonical`"""
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        own_brief = normalize_name(canonical) == normalized
+        with self._lock:
+            for index, key in zip((self._by_words, self._by_letters), name_keys(name)):
+                existing = index.get(key)
+                # A name with its own brief always keeps it; only a link may be repointed at one
+                if existing is None or (own_brief and normalize_name(existing[1]) != existing[0]):
+                    index[key] = (normalized, canonical)
+
+    def add_brief(self, canonical: str, aliases: Iterable[str] = ()) -> None:
+        """Index a stored brief under its own name and its curated aliases"""
+        self.add(canonical, canonical)
+        for alias in aliases:
+            self.add(alias, canonical)
+
+    def find(self, name: str) -> Optional[BriefMatch]:
+        """Stored brief for a name with the same words as an indexed one, if any"""
+        words, letters = name_keys(name)
+        if not words:
+            return None
+        with self._lock:
+            entry = self._by_words.get(words) or self._by_letters.get(letters)
+        return BriefMatch(entry[1], entry[0]) if entry else None
+
+
+brief_index = BriefIndex()
+
+
+def build_brief_index(db, ingredients: Iterable = ()) -> BriefIndex:
+    """Load every stored brief (and watchlist aliases of summarized ingredients) into the index"""
+    summarized = {}
+    for doc in db.collection("ingredient_summaries").stream():
+        # Entries linked to another brief were never reviewed, so they are not trusted as names
+        if (doc.to_dict() or {}).get("canonical"):
+            continue
+        summarized[doc.id] = doc.id
+        brief_index.add_brief(doc.id)
+
+    for ingredient in ingredients:
+        names = [ingredient.name.lower()] + [alias.lower() for alias in ingredient.aliases]
+        canonical = next((summarized[name] for name in names if name in summarized), None)
+        if canonical:
+            for name in names:
+                brief_index.add(name, canonical)
+
+    brief_index.ready = True
+    return brief_index
@@ -1,11 +1,35 @@
+from datetime import datetime, timezone
+
 from backend.firebase_init import db
+from backend.utils.metrics import record_cache, track_external
+from backend.utils.resilience import dependency
+from backend.utils.summary_cache import SUMMARIES_COLLECTION, StoredSummary, stored_summary, summary_cache
 
 def get_summary_from_firestore(ingredient):
-    doc_ref = db.collection("ingredient_summaries").document(ingredient.lower())
-    doc = doc_ref.get()
-    return doc.to_dict()["summary"] if doc.exists else None
+    stored = get_stored_summary(ingredient)
+    return stored.summary if stored else None
 
-def store_summary_in_firestore(ingredient, summary):
-    doc_ref = db.collection("ingredient_summaries").document(ingredient.lower())
-    doc_ref.set({"summary": summary})
+def get_stored_summary(ingredient):
+    """The stored brief with its prompt version; StoredSummary.current is False once the template has moved on"""
+    key = ingredient.lower()
+    cached, stored, epoch = summary_cache.lookup(key)
+    if cached:
+        return stored
+    doc_ref = db.collection(SUMMARIES_COLLECTION).document(key)
+    with dependency("firestore").guard(), track_external("firestore", "summary_get"):
+        doc = doc_ref.get()
+    record_cache("ingredient_summary", doc.exists)
+    stored = stored_summary(doc.to_dict()) if doc.exists else None
+    summary_cache.fill(key, stored, epoch)
+    return stored
 
+def store_summary_in_firestore(ingredient, summary, prompt_version=None):
+    doc_ref = db.collection(SUMMARIES_COLLECTION).document(ingredient.lower())
+    # updated_at lets summary caches on every worker follow new briefs with a narrow listener
+    data = {"summary": summary, "updated_at": datetime.now(timezone.utc)}
+    if prompt_version:
+        # Template the brief was generated with, so briefs from older prompts can be found and regenerated
+        data["prompt_version"] = prompt_version
+    with dependency("firestore").guard(), track_external("firestore", "summary_set"):
+        doc_ref.set(data)
+    summary_cache.put(ingredient.lower(), StoredSummary(summary, prompt_version))
@@ -0,0 +1,231 @@
+"""
+Parsing and validation for bulk ingredient imports
+Accepts the structured JSON format, the legacy ingredient_watchlist.json shape
+and CSV, and normalises all of them into category/ingredient records
+"""
+
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+SEVERITY_LEVELS = ("low", "moderate", "high", "critical")
+LIST_SEPARATOR = ";"
+
+# Record fields by expected JSON type; list fields may also be a LIST_SEPARATOR-separated string
+TEXT_FIELDS = ("id", "name", "description", "category", "category_id", "severity_level",
+               "environmental_impact", "research_summary")
+LIST_FIELDS = ("aliases", "health_concerns")
+
+
+def category_id_for(name: str) -> str:
+    return name.strip().lower().replace(" ", "_")
+
+
+def ingredient_id_for(category_id: str, name: str) -> str:
+    return f"{category_id}_{name.strip().lower().replace(' ', '_')}"
+
+
+@dataclass
+class ImportRecord:
+    """One category or ingredient to upsert
+
+    `values` are applied to new and existing documents alike; `defaults` only
+    fill in fields when the document is created.
+    """
+    id: str
+    values: Dict
+    defaults: Dict = field(default_factory=dict)
+    source: str = ""
+
+
+@dataclass
+class ImportPayload:
+    categories: List[ImportRecord] = field(default_factory=list)
+    ingredients: List[ImportRecord] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def _split_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(LIST_SEPARATOR) if item.strip()]
+
+
+def _parse_bool(value) -> Optional[bool]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _type_errors(raw, source: str) -> List[str]:
+    """Problems with the shape of one record; a record with any is skipped"""
+    if not isinstance(raw, dict):
+        return [f"{source}: expected an object, got {type(raw).__name__}"]
+    errors = []
+    for text_field in TEXT_FIELDS:
+        if raw.get(text_field) is not None and not isinstance(raw[text_field], str):
+            errors.append(f"{source}: {text_field} must be a string")
+    for list_field in LIST_FIELDS:
+        value = raw.get(list_field)
+        if value is None or isinstance(value, str):
+            continue
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            errors.append(f"{source}: {list_field} must be a list of strings")
+    return errors
+
+
+def _category_record(raw: Dict, source: str, payload: ImportPayload) -> Optional[ImportRecord]:
+    errors = _type_errors(raw, source)
+    if errors:
+        payload.errors.extend(errors)
+        return None
+    name = (raw.get("name") or "").strip()
+    if not name:
+        payload.errors.append(f"{source}: category name is required")
+        return None
+    values = {"name": name}
+    if raw.get("description"):
+        values["description"] = raw["description"]
+    if raw.get("severity_level"):
+        values["severity_level"] = str(raw["severity_level"]).strip().lower()
+    if _parse_bool(raw.get("is_active")) is not None:
+        values["is_active"] = _parse_bool(raw.get("is_active"))
+    defaults = {"description": "", "severity_level": "moderate", "is_active": True}
+    return ImportRecord(id=raw.get("id") or category_id_for(name), values=values, defaults=defaults, source=source)
+
+
+def _ingredient_record(raw: Dict, source: str, payload: ImportPayload) -> Optional[ImportRecord]:
+    errors = _type_errors(raw, source)
+    if errors:
+        payload.errors.extend(errors)
+        return None
+    name = (raw.get("name") or "").strip().lower()
+    category_id = raw.get("category_id") or (category_id_for(raw["category"]) if raw.get("category") else "")
+    if not name:
+        payload.errors.append(f"{source}: ingredient name is required")
+        return None
+    if not category_id:
+        payload.errors.append(f"{source}: ingredient '{name}' needs a category or category_id")
+        return None
+    values = {"name": name, "category_id": category_id}
+    for list_field in ("aliases", "health_concerns"):
+        if raw.get(list_field) not in (None, ""):
+            values[list_field] = _split_list(raw[list_field])
+    for text_field in ("environmental_impact", "research_summary"):
+        if raw.get(text_field):
+            values[text_field] = raw[text_field]
+    if raw.get("severity_level"):
+        values["severity_level"] = str(raw["severity_level"]).strip().lower()
+    if _parse_bool(raw.get("is_active")) is not None:
+        values["is_active"] = _parse_bool(raw.get("is_active"))
+    defaults = {"aliases": [], "health_concerns": [], "environmental_impact": None, "research_summary": None,
+                "severity_level": "moderate", "is_active": True}
+    return ImportRecord(id=raw.get("id") or ingredient_id_for(category_id, name), values=values,
+                        defaults=defaults, source=source)
+
+
+def parse_json_payload(data: Dict, default_severity=lambda category_name: "moderate") -> ImportPayload:
+    """Parse {"categories": [...], "ingredients": [...]} or the legacy {category: [names]} watchlist"""
+    payload = ImportPayload()
+    if not isinstance(data, dict):
+        payload.errors.append("JSON body must be an object")
+        return payload
+
+    if "categories" in data or "ingredients" in data:
+        for key, parse, records in (("categories", _category_record, payload.categories),
+                                    ("ingredients", _ingredient_record, payload.ingredients)):
+            raws = data.get(key) or []
+            if not isinstance(raws, list):
+                payload.errors.append(f"{key}: expected a list of objects")
+                continue
+            for i, raw in enumerate(raws):
+                record = parse(raw, f"{key}[{i}]", payload)
+                if record:
+                    records.append(record)
+        return _validate(payload)
+
+    # Legacy watchlist: category name -> list of ingredient names
+    for category_name, names in data.items():
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            payload.errors.append(f"{category_name}: expected a list of ingredient names")
+            continue
+        severity = default_severity(category_name)
+        category_id = category_id_for(category_name)
+        payload.categories.append(ImportRecord(
+            id=category_id,
+            values={"name": category_name},
+            defaults={"description": f"Migrated from JSON watchlist: {category_name}",
+                      "severity_level": severity, "is_active": True},
+            source=category_name,
+        ))
+        for name in names:
+            payload.ingredients.append(ImportRecord(
+                id=ingredient_id_for(category_id, name),
+                values={"name": name.lower(), "category_id": category_id},
+                defaults={"aliases": [name], "health_concerns": [], "environmental_impact": None,
+                          "research_summary": None, "severity_level": severity, "is_active": True},
+                source=f"{category_name}: {name}",
+            ))
+    return _validate(payload)
+
+
+def parse_csv_payload(text: str) -> ImportPayload:
+    """Parse CSV with one row per record
+
+    Columns: record_type (optional, "category" or "ingredient"), name, category
+    (or category_id), description, aliases, severity_level, health_concerns,
+    environmental_impact, research_summary, is_active. List columns use ";".
+    Categories referenced by ingredient rows are created if they do not exist.
+    """
+    payload = ImportPayload()
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "name" not in reader.fieldnames:
+        payload.errors.append("CSV must have a header row with at least a 'name' column")
+        return payload
+
+    implied_categories = {}
+    for line, row in enumerate(reader, start=2):
+        row = {key.strip(): (value.strip() if isinstance(value, str) else value)
+               for key, value in row.items() if key}
+        source = f"line {line}"
+        if (row.get("record_type") or "ingredient").lower() == "category":
+            record = _category_record(row, source, payload)
+            if record:
+                payload.categories.append(record)
+            continue
+        record = _ingredient_record(row, source, payload)
+        if record:
+            payload.ingredients.append(record)
+            if row.get("category"):
+                implied_categories.setdefault(record.values["category_id"], row["category"])
+
+    explicit = {record.id for record in payload.categories}
+    for category_id, name in implied_categories.items():
+        if category_id not in explicit:
+            # Only fills in a missing category; never renames an existing one
+            payload.categories.append(ImportRecord(
+                id=category_id, values={},
+                defaults={"name": name, "description": "", "severity_level": "moderate", "is_active": True},
+                source=f"category '{name}'",
+            ))
+    return _validate(payload)
+
+
+def _validate(payload: ImportPayload) -> ImportPayload:
+    """Reject unknown severities and duplicate ids within the payload"""
+    for kind, records in (("category", payload.categories), ("ingredient", payload.ingredients)):
+        seen = set()
+        for record in records:
+            severity = record.values.get("severity_level")
+            if severity is not None and severity not in SEVERITY_LEVELS:
+                payload.errors.append(
+                    f"{record.source}: severity_level must be one of {', '.join(SEVERITY_LEVELS)}")
+            if record.id in seen:
+                payload.errors.append(f"{record.source}: duplicate {kind} '{record.id}'")
+            seen.add(record.id)
+    return payload
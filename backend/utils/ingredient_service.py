@@ -3,14 +3,89 @@ Scalable Ingredient Management Service
 Handles ingredient categories, flags, and research data
 """
 
-from typing import List, Dict, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Set, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, fields, replace
 from datetime import datetime
+from firebase_admin import firestore
 from backend.firebase_init import db
+from backend.utils.ingredient_import import ImportPayload, ImportRecord, parse_json_payload
+from backend.utils.metrics import observe_stage, record_cache, time_stage, track_external
+from backend.utils.resilience import dependency
+from backend.utils.shared_cache import shared_cache
+from backend.utils.watchlist_snapshot import WatchlistSnapshot, build_snapshot, open_snapshot, write_snapshot
 import logging
+import os
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Document holding the watchlist version counter, bumped on every category/ingredient write
+WATCHLIST_META_COLLECTION = "metadata"
+WATCHLIST_META_DOCUMENT = "watchlist"
+
+# How often a cached flagging index re-checks the watchlist version (other workers may have written)
+INDEX_VERSION_CHECK_SECONDS = float(os.getenv("WATCHLIST_VERSION_CHECK_SECONDS", 30))
+
+# Compiled indexes shared between workers are keyed on the watchlist version, so the TTL only bounds disk use
+SHARED_INDEX_TTL_SECONDS = 24 * 3600
+
+# Compiled watchlist written on every rebuild and memory-mapped at startup (empty disables the file)
+WATCHLIST_SNAPSHOT_PATH = os.getenv("WATCHLIST_SNAPSHOT_PATH", "")
+
+# Patterns that suggest potentially problematic ingredients not on the watchlist
+# (matched case-insensitively from the start of the name; exported in watchlist snapshots)
+AUTO_FLAG_PATTERNS = [
+    # Chemical-sounding names
+    r'.*ate$',  # sulfates, phosphates, etc.
+    r'.*ide$',  # chlorides, bromides, etc.
+    r'.*ene$',  # benzene, propylene, etc.
+    r'.*ol$',   # alcohols, phenols, etc.
+    r'.*ium$',  # sodium, potassium, etc.
+
+    # Common preservatives and additives
+    r'.*benzoate.*',
+    r'.*sorbate.*',
+    r'.*nitrate.*',
+    r'.*nitrite.*',
+    r'.*sulfite.*',
+    r'.*phosphate.*',
+    r'.*propionate.*',
+
+    # Artificial colors and flavors
+    r'.*red\s*\d+.*',
+    r'.*yellow\s*\d+.*',
+    r'.*blue\s*\d+.*',
+    r'.*green\s*\d+.*',
+    r'.*artificial.*',
+    r'.*synthetic.*',
+
+    # Emulsifiers and thickeners
+    r'.*gum.*',
+    r'.*carrageenan.*',
+    r'.*polysorbate.*',
+    r'.*lecithin.*',
+    r'.*mono.*diglyceride.*',
+
+    # Sweeteners
+    r'.*aspartame.*',
+    r'.*sucralose.*',
+    r'.*saccharin.*',
+    r'.*stevia.*',
+    r'.*xylitol.*',
+    r'.*sorbitol.*',
+
+    # MSG and flavor enhancers
+    r'.*glutamate.*',
+    r'.*inosinate.*',
+    r'.*guanylate.*',
+]
+AUTO_FLAG_RULE = re.compile("|".join(f"(?:{pattern})" for pattern in AUTO_FLAG_PATTERNS), re.IGNORECASE)
+
+# Firestore's limit on writes per batch
+MAX_BATCH_WRITES = 500
+
 @dataclass
 class IngredientCategory:
     """Represents an ingredient category (e.g., 'artificial sweeteners', 'preservatives')"""
@@ -37,6 +112,19 @@ class Ingredient:
     created_at: datetime
     updated_at: datetime
 
+    @property
+    def has_research_summary(self) -> bool:
+        return bool(self.research_summary)
+
+@dataclass
+class MappedIngredient(Ingredient):
+    """Ingredient decoded from a watchlist snapshot, which records that a summary exists but not its text"""
+    summary_stored: bool = False
+
+    @property
+    def has_research_summary(self) -> bool:
+        return self.summary_stored
+
 @dataclass
 class IngredientFlag:
     """Represents a flagged ingredient in a product scan"""
@@ -44,7 +132,52 @@ class IngredientFlag:
     category: str
     severity: str
     health_concerns: List[str]
-    research_summary: str
+    has_research_summary: bool
+
+@dataclass
+class WatchlistIndex:
+    """Compiled watchlist used for flagging: every active name and alias -> (ingredient, category)"""
+    version: int
+    entries: Dict[str, Tuple[Ingredient, Optional[IngredientCategory]]]
+
+class SnapshotEntries:
+    """WatchlistIndex entries read lazily from a memory-mapped snapshot; only found names are decoded"""
+
+    def __init__(self, snapshot: WatchlistSnapshot):
+        self.snapshot = snapshot
+        self._decoded: Dict[str, Tuple[Ingredient, Optional[IngredientCategory]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.snapshot)
+
+    def get(self, name: str, default=None) -> Optional[Tuple[Ingredient, Optional[IngredientCategory]]]:
+        if name in self._decoded:
+            return self._decoded[name]
+        found = self.snapshot.lookup(name)
+        if found is None:
+            return default
+        category = None
+        if found.category:
+            category = IngredientCategory(id=found.category.id, name=found.category.name, description="",
+                                          severity_level=found.category.severity_level, is_active=True,
+                                          created_at=None, updated_at=None)
+        ingredient = MappedIngredient(id=found.id, name=found.name, aliases=[],
+                                      category_id=found.category.id if found.category else "",
+                                      severity_level=found.severity_level, health_concerns=found.health_concerns,
+                                      environmental_impact=None, research_summary=None,
+                                      is_active=True, created_at=None, updated_at=None,
+                                      summary_stored=found.has_research_summary)
+        self._decoded[name] = (ingredient, category)
+        return self._decoded[name]
+
+@contextmanager
+def _firestore(operation: str):
+    """Run one Firestore read under its breaker and bulkhead; queries must be consumed inside"""
+    with dependency("firestore").guard(), track_external("firestore", operation):
+        yield
+
+CATEGORY_FIELDS = [f.name for f in fields(IngredientCategory)]
+INGREDIENT_FIELDS = [f.name for f in fields(Ingredient)]
 
 class IngredientService:
     """Service for managing ingredients and categories"""
@@ -53,6 +186,48 @@ class IngredientService:
         self.db = db
         if not self.db:
             raise Exception("Firestore not initialized")
+        self._index: Optional[WatchlistIndex] = None
+        self._index_checked_at = 0.0
+        self._snapshot: Optional[WatchlistSnapshot] = None
+    
+    # Watchlist versioning
+    async def get_watchlist_version(self) -> int:
+        """Current watchlist version; changes whenever a category or ingredient is written"""
+        try:
+            with _firestore("watchlist_version"):
+                doc = self.db.collection(WATCHLIST_META_COLLECTION).document(WATCHLIST_META_DOCUMENT).get()
+            return (doc.to_dict() or {}).get("version", 0) if doc.exists else 0
+        except Exception as e:
+            logger.error(f"Error getting watchlist version: {e}")
+            raise
+    
+    def _bump_watchlist_version(self) -> None:
+        """Invalidate anything keyed on the watchlist version (listing ETags, caches)"""
+        self.db.collection(WATCHLIST_META_COLLECTION).document(WATCHLIST_META_DOCUMENT).set(
+            {"version": firestore.Increment(1), "updated_at": datetime.now()}, merge=True
+        )
+    
+    async def _list_page(self, collection: str, limit: int, cursor: Optional[str] = None,
+                         filters: Optional[Dict[str, object]] = None,
+                         projection: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Read one page of a collection ordered by document id; returns the page and the next cursor"""
+        query = self.db.collection(collection)
+        for field, value in (filters or {}).items():
+            if value is not None:
+                query = query.where(field, "==", value)
+        # Ordering by document id needs no composite index alongside equality filters
+        query = query.order_by("__name__")
+        if cursor:
+            query = query.start_after({"__name__": cursor})
+        if projection is not None:
+            query = query.select(sorted(set(projection) | {"id"}))
+        
+        # One extra document tells us whether another page exists
+        with _firestore(f"{collection}_page"):
+            docs = list(query.limit(limit + 1).stream())
+        page = [doc.to_dict() for doc in docs[:limit]]
+        next_cursor = docs[limit - 1].id if len(docs) > limit else None
+        return page, next_cursor
     
     # Category Management
     async def create_category(self, category: IngredientCategory) -> str:
@@ -60,6 +235,8 @@ class IngredientService:
         try:
             doc_ref = self.db.collection("ingredient_categories").document(category.id)
             doc_ref.set(asdict(category))
+            self._bump_watchlist_version()
+            self.invalidate_index()
             logger.info(f"Created category: {category.name}")
             return category.id
         except Exception as e:
@@ -69,7 +246,8 @@ class IngredientService:
     async def get_category(self, category_id: str) -> Optional[IngredientCategory]:
         """Get a category by ID"""
         try:
-            doc = self.db.collection("ingredient_categories").document(category_id).get()
+            with _firestore("category_get"):
+                doc = self.db.collection("ingredient_categories").document(category_id).get()
             if doc.exists:
                 data = doc.to_dict()
                 return IngredientCategory(**data)
@@ -85,7 +263,8 @@ class IngredientService:
             if active_only:
                 query = query.where("is_active", "==", True)
             
-            docs = query.stream()
+            with _firestore("category_list"):
+                docs = list(query.stream())
             categories = []
             for doc in docs:
                 data = doc.to_dict()
@@ -95,12 +274,25 @@ class IngredientService:
             logger.error(f"Error getting categories: {e}")
             raise
     
+    async def list_categories(self, limit: int, cursor: Optional[str] = None,
+                              severity_level: Optional[str] = None, projection: Optional[List[str]] = None,
+                              active_only: bool = True) -> Tuple[List[Dict], Optional[str]]:
+        """Get one page of categories, optionally filtered and projected"""
+        try:
+            filters = {"is_active": True if active_only else None, "severity_level": severity_level}
+            return await self._list_page("ingredient_categories", limit, cursor, filters, projection)
+        except Exception as e:
+            logger.error(f"Error listing categories: {e}")
+            raise
+    
     # Ingredient Management
     async def create_ingredient(self, ingredient: Ingredient) -> str:
         """Create a new ingredient"""
         try:
             doc_ref = self.db.collection("ingredients").document(ingredient.id)
             doc_ref.set(asdict(ingredient))
+            self._bump_watchlist_version()
+            self.invalidate_index()
             logger.info(f"Created ingredient: {ingredient.name}")
             return ingredient.id
         except Exception as e:
@@ -110,7 +302,8 @@ class IngredientService:
     async def get_ingredient(self, ingredient_id: str) -> Optional[Ingredient]:
         """Get an ingredient by ID"""
         try:
-            doc = self.db.collection("ingredients").document(ingredient_id).get()
+            with _firestore("ingredient_get"):
+                doc = self.db.collection("ingredients").document(ingredient_id).get()
             if doc.exists:
                 data = doc.to_dict()
                 return Ingredient(**data)
@@ -125,13 +318,15 @@ class IngredientService:
             name_lower = name.lower().strip()
             
             # Search by exact name
-            docs = self.db.collection("ingredients").where("name", "==", name_lower).limit(1).stream()
+            with _firestore("ingredient_search"):
+                docs = list(self.db.collection("ingredients").where("name", "==", name_lower).limit(1).stream())
             for doc in docs:
                 data = doc.to_dict()
                 return Ingredient(**data)
             
             # Search by aliases
-            docs = self.db.collection("ingredients").stream()
+            with _firestore("ingredient_list"):
+                docs = list(self.db.collection("ingredients").stream())
             for doc in docs:
                 data = doc.to_dict()
                 ingredient = Ingredient(**data)
@@ -150,7 +345,8 @@ class IngredientService:
             if active_only:
                 query = query.where("is_active", "==", True)
             
-            docs = query.stream()
+            with _firestore("ingredient_list"):
+                docs = list(query.stream())
             ingredients = []
             for doc in docs:
                 data = doc.to_dict()
@@ -160,7 +356,116 @@ class IngredientService:
             logger.error(f"Error getting ingredients: {e}")
             raise
     
+    async def list_ingredients(self, limit: int, cursor: Optional[str] = None,
+                               category_id: Optional[str] = None, severity_level: Optional[str] = None,
+                               projection: Optional[List[str]] = None,
+                               active_only: bool = True) -> Tuple[List[Dict], Optional[str]]:
+        """Get one page of ingredients, optionally filtered by category/severity and projected"""
+        try:
+            filters = {
+                "is_active": True if active_only else None,
+                "category_id": category_id,
+                "severity_level": severity_level,
+            }
+            return await self._list_page("ingredients", limit, cursor, filters, projection)
+        except Exception as e:
+            logger.error(f"Error listing ingredients: {e}")
+            raise
+    
     # Scanning Logic
+    def invalidate_index(self) -> None:
+        """Drop the compiled flagging index; the next scan rebuilds it"""
+        self._index = None
+    
+    async def rebuild_index(self) -> WatchlistIndex:
+        """Compile the flagging index from Firestore in one pass over ingredients and categories"""
+        try:
+            version = await self.get_watchlist_version()
+            ingredients = await self.get_all_ingredients(active_only=True)
+            categories = {category.id: category for category in await self.get_all_categories(active_only=False)}
+            
+            entries: Dict[str, Tuple[Ingredient, Optional[IngredientCategory]]] = {}
+            for ingredient in ingredients:
+                entries[ingredient.name.lower()] = (ingredient, categories.get(ingredient.category_id))
+            # Exact names win over aliases, matching search_ingredient_by_name
+            for ingredient in ingredients:
+                for alias in ingredient.aliases:
+                    entries.setdefault(alias.lower(), (ingredient, categories.get(ingredient.category_id)))
+            
+            self._index = WatchlistIndex(version=version, entries=entries)
+            self._index_checked_at = time.monotonic()
+            shared_cache.put("watchlist_index", "current", self._index, str(version), SHARED_INDEX_TTL_SECONDS)
+            logger.info(f"Compiled watchlist index v{version} with {len(entries)} names")
+            self._save_snapshot(self._index)
+            return self._index
+        except Exception as e:
+            logger.error(f"Error building watchlist index: {e}")
+            raise
+    
+    def _save_snapshot(self, index: WatchlistIndex) -> None:
+        """Serialize a freshly compiled index so the next startup can map it instead of rebuilding"""
+        try:
+            with time_stage("snapshot.build"):
+                data = build_snapshot(index.version, index.entries, AUTO_FLAG_PATTERNS)
+            self._snapshot = WatchlistSnapshot(data, verify=False)
+            if WATCHLIST_SNAPSHOT_PATH:
+                write_snapshot(WATCHLIST_SNAPSHOT_PATH, data)
+        except Exception as e:
+            # The snapshot only saves work; flagging carries on with the in-memory index
+            logger.warning(f"Error saving watchlist snapshot: {e}")
+    
+    def load_snapshot(self, path: str = WATCHLIST_SNAPSHOT_PATH) -> bool:
+        """Start from a snapshot file instead of compiling the watchlist; returns whether one was loaded
+        
+        The snapshot's version is confirmed against Firestore on the first scan, and
+        a snapshot taken with different auto-flag rules is ignored.
+        """
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            snapshot = open_snapshot(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring watchlist snapshot {path}: {e}")
+            return False
+        if snapshot.rules != AUTO_FLAG_PATTERNS:
+            logger.info(f"Ignoring watchlist snapshot {path}: auto-flag rules have changed")
+            snapshot.close()
+            return False
+        self._snapshot = snapshot
+        self._index = WatchlistIndex(version=snapshot.version, entries=SnapshotEntries(snapshot))
+        self._index_checked_at = float("-inf")
+        logger.info(f"Loaded watchlist snapshot v{snapshot.version} with {len(snapshot)} names")
+        return True
+    
+    async def get_watchlist_snapshot(self) -> WatchlistSnapshot:
+        """Snapshot of the current watchlist version, built from the compiled index when needed"""
+        index = await self.get_watchlist_index()
+        if self._snapshot is None or self._snapshot.version != index.version:
+            with time_stage("snapshot.build"):
+                self._snapshot = WatchlistSnapshot(
+                    build_snapshot(index.version, index.entries, AUTO_FLAG_PATTERNS), verify=False)
+        return self._snapshot
+    
+    async def get_watchlist_index(self) -> WatchlistIndex:
+        """Return the compiled index, rebuilding it when the watchlist version has moved on"""
+        if self._index is not None and time.monotonic() - self._index_checked_at < INDEX_VERSION_CHECK_SECONDS:
+            record_cache("watchlist_index", True)
+            return self._index
+        version = await self.get_watchlist_version()
+        if self._index is not None and self._index.version == version:
+            self._index_checked_at = time.monotonic()
+            record_cache("watchlist_index", True)
+            return self._index
+        # Another worker on this host may already have compiled this version
+        shared = shared_cache.get("watchlist_index", "current", str(version))
+        if shared is not None:
+            self._index = shared
+            self._index_checked_at = time.monotonic()
+            record_cache("watchlist_index", True)
+            return self._index
+        record_cache("watchlist_index", False)
+        return await self.rebuild_index()
+    
     async def get_active_ingredient_names(self) -> Set[str]:
         """Get all active ingredient names and aliases for fast scanning"""
         try:
@@ -177,49 +482,67 @@ class IngredientService:
             logger.error(f"Error getting ingredient names: {e}")
             raise
     
-    async def flag_ingredients_in_text(self, ingredients_text: str) -> List[IngredientFlag]:
-        """Flag ingredients found in product ingredients text"""
+    async def flag_ingredients_in_text(self, ingredients_text: str,
+                                       known: Optional[Dict[str, Optional[IngredientFlag]]] = None) -> List[IngredientFlag]:
+        """Flag ingredients found in product ingredients text
+        
+        `known` maps normalized ingredient names to an earlier result for the same
+        watchlist version (None when the name was not flagged); those names are
+        not looked up again.
+        """
         try:
             if not ingredients_text:
                 return []
             
-            # Get all active ingredient names
-            active_names = await self.get_active_ingredient_names()
+            # Get the compiled watchlist (names and aliases with their records)
+            with time_stage("flag.load_watchlist"):
+                index = await self.get_watchlist_index()
             
             # Parse ingredients (split by comma and clean)
-            ingredient_list = [ing.strip() for ing in ingredients_text.split(',')]
+            with time_stage("flag.tokenize"):
+                ingredient_list = [ing.strip() for ing in ingredients_text.split(',')]
             
+            # Watchlist lookups and regex rules are interleaved, so accumulate and report once
+            lookup_seconds = 0.0
+            rules_seconds = 0.0
             flagged = []
             for ingredient_text in ingredient_list:
                 name = ingredient_text.lower().strip()
                 
+                if known is not None and name in known:
+                    if known[name] is not None:
+                        flagged.append(replace(known[name], ingredient_name=ingredient_text.strip()))
+                    continue
+                
                 # Check if this ingredient is in our watchlist
-                if name in active_names:
-                    # Find the full ingredient record
-                    ingredient = await self.search_ingredient_by_name(name)
-                    if ingredient:
-                        # Get category info
-                        category = await self.get_category(ingredient.category_id)
-                        
-                        flagged.append(IngredientFlag(
-                            ingredient_name=ingredient_text.strip(),
-                            category=category.name if category else "Unknown",
-                            severity=ingredient.severity_level or (category.severity_level if category else "moderate"),
-                            health_concerns=ingredient.health_concerns or [],
-                            research_summary=ingredient.research_summary or ""
-                        ))
+                start = time.perf_counter()
+                entry = index.entries.get(name)
+                lookup_seconds += time.perf_counter() - start
+                if entry:
+                    ingredient, category = entry
+                    flagged.append(IngredientFlag(
+                        ingredient_name=ingredient_text.strip(),
+                        category=category.name if category else "Unknown",
+                        severity=ingredient.severity_level or (category.severity_level if category else "moderate"),
+                        health_concerns=ingredient.health_concerns or [],
+                        has_research_summary=ingredient.has_research_summary
+                    ))
                 else:
+                    start = time.perf_counter()
                     # Check if this ingredient should be flagged based on known patterns
                     should_flag = await self._should_flag_unknown_ingredient(name)
+                    rules_seconds += time.perf_counter() - start
                     if should_flag:
                         flagged.append(IngredientFlag(
                             ingredient_name=ingredient_text.strip(),
                             category="Auto-Flagged",
                             severity="moderate",
                             health_concerns=[],
-                            research_summary=""  # Will be generated when user clicks
+                            has_research_summary=False  # Will be generated when user clicks
                         ))
             
+            observe_stage("flag.lookup", lookup_seconds)
+            observe_stage("flag.auto_rules", rules_seconds)
             return flagged
         except Exception as e:
             logger.error(f"Error flagging ingredients: {e}")
@@ -227,101 +550,94 @@ class IngredientService:
     
     async def _should_flag_unknown_ingredient(self, ingredient_name: str) -> bool:
         """Determine if an unknown ingredient should be flagged for research"""
-        # List of patterns that suggest potentially problematic ingredients
-        suspicious_patterns = [
-            # Chemical-sounding names
-            r'.*ate$',  # sulfates, phosphates, etc.
-            r'.*ide$',  # chlorides, bromides, etc.
-            r'.*ene$',  # benzene, propylene, etc.
-            r'.*ol$',   # alcohols, phenols, etc.
-            r'.*ium$',  # sodium, potassium, etc.
+        return AUTO_FLAG_RULE.match(ingredient_name) is not None
+    
+    # Bulk import
+    async def bulk_upsert(self, payload: ImportPayload, dry_run: bool = False) -> Dict:
+        """Diff categories and ingredients against Firestore and write only what changed
+
+        Writes go out in atomic batches of up to 500 documents. The watchlist
+        version is bumped and the flagging index rebuilt once, after the last
+        batch, or after a failed batch if any earlier one committed.
+        """
+        try:
+            if payload.errors:
+                raise ValueError("; ".join(payload.errors))
             
-            # Common preservatives and additives
-            r'.*benzoate.*',
-            r'.*sorbate.*',
-            r'.*nitrate.*',
-            r'.*nitrite.*',
-            r'.*sulfite.*',
-            r'.*phosphate.*',
-            r'.*propionate.*',
+            with _firestore("category_list"):
+                current_categories = {doc.id: doc.to_dict() for doc in self.db.collection("ingredient_categories").stream()}
+            with _firestore("ingredient_list"):
+                current_ingredients = {doc.id: doc.to_dict() for doc in self.db.collection("ingredients").stream()}
             
-            # Artificial colors and flavors
-            r'.*red\s*\d+.*',
-            r'.*yellow\s*\d+.*',
-            r'.*blue\s*\d+.*',
-            r'.*green\s*\d+.*',
-            r'.*artificial.*',
-            r'.*synthetic.*',
+            known_categories = set(current_categories) | {record.id for record in payload.categories}
+            missing = sorted({record.values["category_id"] for record in payload.ingredients} - known_categories)
+            if missing:
+                raise ValueError(f"Unknown categories: {', '.join(missing)}")
             
-            # Emulsifiers and thickeners
-            r'.*gum.*',
-            r'.*carrageenan.*',
-            r'.*polysorbate.*',
-            r'.*lecithin.*',
-            r'.*mono.*diglyceride.*',
+            now = datetime.now()
+            category_writes, category_stats = self._diff_records(payload.categories, current_categories, now)
+            ingredient_writes, ingredient_stats = self._diff_records(payload.ingredients, current_ingredients, now)
             
-            # Sweeteners
-            r'.*aspartame.*',
-            r'.*sucralose.*',
-            r'.*saccharin.*',
-            r'.*stevia.*',
-            r'.*xylitol.*',
-            r'.*sorbitol.*',
+            writes = [("ingredient_categories", data) for data in category_writes]
+            writes += [("ingredients", data) for data in ingredient_writes]
+            batches = 0
+            if not dry_run:
+                try:
+                    for start in range(0, len(writes), MAX_BATCH_WRITES):
+                        batch = self.db.batch()
+                        for collection, data in writes[start:start + MAX_BATCH_WRITES]:
+                            batch.set(self.db.collection(collection).document(data["id"]), data)
+                        batch.commit()
+                        batches += 1
+                finally:
+                    # Committed batches must reach readers even when a later one failed
+                    if batches:
+                        self._bump_watchlist_version()
+                        await self.rebuild_index()
             
-            # MSG and flavor enhancers
-            r'.*glutamate.*',
-            r'.*inosinate.*',
-            r'.*guanylate.*',
-        ]
-        
-        import re
-        for pattern in suspicious_patterns:
-            if re.match(pattern, ingredient_name, re.IGNORECASE):
-                return True
-        
-        return False
+            logger.info(f"Bulk import wrote {len(writes)} documents in {batches} batches (dry_run={dry_run})")
+            return {
+                "dry_run": dry_run,
+                "categories": category_stats,
+                "ingredients": ingredient_stats,
+                "writes": len(writes),
+                "batches": batches
+            }
+        except Exception as e:
+            logger.error(f"Error during bulk import: {e}")
+            raise
+    
+    def _diff_records(self, records: List[ImportRecord], current: Dict[str, Dict],
+                      now: datetime) -> Tuple[List[Dict], Dict[str, int]]:
+        """Full documents to write for new or changed records, plus created/updated/unchanged counts"""
+        writes = []
+        stats = {"created": 0, "updated": 0, "unchanged": 0}
+        for record in records:
+            existing = current.get(record.id)
+            if existing is None:
+                data = {**record.defaults, **record.values, "id": record.id, "created_at": now, "updated_at": now}
+                writes.append(data)
+                stats["created"] += 1
+                continue
+            
+            merged = {**existing, **record.values}
+            if merged == existing:
+                stats["unchanged"] += 1
+                continue
+            # created_at is preserved; only updated_at moves
+            merged["updated_at"] = now
+            writes.append(merged)
+            stats["updated"] += 1
+        return writes, stats
     
     # Migration from old system
-    async def migrate_from_json(self, json_data: Dict) -> None:
+    async def migrate_from_json(self, json_data: Dict) -> Dict:
         """Migrate ingredients from the old JSON format"""
         try:
             logger.info("Starting migration from JSON watchlist...")
-            
-            for category_name, ingredient_list in json_data.items():
-                # Create category
-                category_id = category_name.lower().replace(" ", "_")
-                category = IngredientCategory(
-                    id=category_id,
-                    name=category_name,
-                    description=f"Migrated from JSON watchlist: {category_name}",
-                    severity_level=self._get_default_severity(category_name),
-                    is_active=True,
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
-                )
-                
-                await self.create_category(category)
-                
-                # Create ingredients
-                for ingredient_name in ingredient_list:
-                    ingredient_id = f"{category_id}_{ingredient_name.lower().replace(' ', '_')}"
-                    ingredient = Ingredient(
-                        id=ingredient_id,
-                        name=ingredient_name.lower(),
-                        aliases=[ingredient_name],  # Original name as alias
-                        category_id=category_id,
-                        severity_level=category.severity_level,
-                        health_concerns=[],
-                        environmental_impact=None,
-                        research_summary=None,
-                        is_active=True,
-                        created_at=datetime.now(),
-                        updated_at=datetime.now()
-                    )
-                    
-                    await self.create_ingredient(ingredient)
-            
+            summary = await self.bulk_upsert(parse_json_payload(json_data, self._get_default_severity))
             logger.info("Migration completed successfully!")
+            return summary
         except Exception as e:
             logger.error(f"Error during migration: {e}")
             raise
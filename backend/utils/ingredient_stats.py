@@ -0,0 +1,201 @@
+"""
+Incrementally maintained flag statistics
+Every scan feeds per-ingredient scan counts, product counts and a sparse
+co-occurrence map into in-process counters, which are flushed to the
+ingredient_stats collection as Firestore increments. Admin reporting and brief
+pre-generation read these documents instead of re-flagging every product.
+"""
+
+import hashlib
+import itertools
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from firebase_admin import firestore
+
+from backend.firebase_init import db
+from backend.utils.metrics import time_stage, track_external
+from backend.utils.resilience import dependency
+
+logger = logging.getLogger(__name__)
+
+STATS_COLLECTION = "ingredient_stats"
+SUMMARIES_COLLECTION = "ingredient_summaries"
+
+# Pending deltas are flushed on this interval by the app
+FLUSH_INTERVAL_SECONDS = float(os.getenv("STATS_FLUSH_SECONDS", 30))
+
+# Firestore's limit on writes per batch
+MAX_BATCH_WRITES = 500
+
+
+def valid_document_id(name: str) -> bool:
+    """Whether Firestore accepts `name` as a document id as-is"""
+    return (bool(name) and "/" not in name and name not in (".", "..")
+            and not (name.startswith("__") and name.endswith("__")) and len(name.encode()) <= 1500)
+
+
+def stats_document_id(name: str) -> str:
+    """Document id for an ingredient's stats; names Firestore would reject ("and/or") are hashed"""
+    if valid_document_id(name):
+        return name
+    return "sha1-" + hashlib.sha1(name.encode()).hexdigest()
+
+
+class IngredientStats:
+    """Write-behind aggregation of flag results
+
+    For each flagged ingredient (keyed by its normalized label name, the same key
+    briefs use, and stored under stats_document_id of it):
+      - scans: scans whose product flagged it
+      - products: products currently flagging it
+      - cooccurrence: {other ingredient: products flagging both}
+      - has_brief: set once a research brief exists
+    Product and co-occurrence counts only move when a product's flag set changes,
+    so rescanning the same product just bumps `scans`. All writes are increments,
+    so every worker can flush its own deltas.
+    """
+
+    def __init__(self):
+        self.db = db
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._scans: Counter = Counter()
+        self._products: Counter = Counter()
+        self._pairs: Dict[str, Counter] = defaultdict(Counter)
+        self._last_scanned: Dict[str, datetime] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(set(self._scans) | set(self._products) | set(self._pairs))
+
+    def record(self, flagged: Iterable[str], previous: Optional[Iterable[str]] = None, scanned: bool = True) -> None:
+        """Record one product's flag result
+
+        `previous` is the product's flag set before this fetch (None for a product
+        not counted before); `scanned` is False for background refreshes.
+        """
+        current = {name.lower().strip() for name in flagged if name and name.strip()}
+        before: Set[str] = {name.lower().strip() for name in previous or [] if name and name.strip()}
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            if scanned:
+                for name in current:
+                    self._scans[name] += 1
+                    self._last_scanned[name] = now
+            if previous is not None and current == before:
+                return
+            for name in current - before:
+                self._products[name] += 1
+            for name in before - current:
+                self._products[name] -= 1
+            new_pairs = set(itertools.combinations(sorted(current), 2))
+            old_pairs = set(itertools.combinations(sorted(before), 2))
+            for delta, pairs in ((1, new_pairs - old_pairs), (-1, old_pairs - new_pairs)):
+                for a, b in pairs:
+                    self._pairs[a][b] += delta
+                    self._pairs[b][a] += delta
+
+    def flush(self) -> int:
+        """Write pending deltas as batched increments; returns the number of documents written"""
+        with self._lock:
+            scans, products, pairs, last_scanned = self._scans, self._products, self._pairs, self._last_scanned
+            self._reset()
+        names = set(scans) | set(products) | set(pairs)
+        if not names:
+            return 0
+
+        collection = self.db.collection(STATS_COLLECTION)
+        writes = 0
+        try:
+            with time_stage("stats.flush"):
+                for start in range(0, len(names), MAX_BATCH_WRITES):
+                    batch = self.db.batch()
+                    for name in sorted(names)[start:start + MAX_BATCH_WRITES]:
+                        update = {"name": name}
+                        if scans[name]:
+                            update["scans"] = firestore.Increment(scans[name])
+                            update["last_scanned_at"] = last_scanned[name]
+                        if products[name]:
+                            update["products"] = firestore.Increment(products[name])
+                        cooccurrence = {other: firestore.Increment(count) for other, count in pairs[name].items() if count}
+                        if cooccurrence:
+                            update["cooccurrence"] = cooccurrence
+                        batch.set(collection.document(stats_document_id(name)), update, merge=True)
+                        writes += 1
+                    with dependency("firestore").guard(), track_external("firestore", "stats_flush"):
+                        batch.commit()
+        except Exception as e:
+            # Put the deltas back so the next flush retries them
+            logger.error(f"Error flushing ingredient stats: {e}")
+            with self._lock:
+                self._scans.update(scans)
+                self._products.update(products)
+                for name, counts in pairs.items():
+                    self._pairs[name].update(counts)
+                for name, at in last_scanned.items():
+                    self._last_scanned.setdefault(name, at)
+            raise
+        return writes
+
+    def mark_summarized(self, name: str) -> None:
+        """Take an ingredient off the unsummarized queue once its brief is stored"""
+        name = name.lower().strip()
+        try:
+            with dependency("firestore").guard(), track_external("firestore", "stats_set"):
+                self.db.collection(STATS_COLLECTION).document(stats_document_id(name)).set(
+                    {"name": name, "has_brief": True}, merge=True)
+        except Exception as e:
+            logger.error(f"Error marking {name} as summarized: {e}")
+
+    def top_ingredients(self, limit: int = 50, order_by: str = "scans") -> List[dict]:
+        """Most scanned (or most widespread, order_by="products") flagged ingredients"""
+        query = (self.db.collection(STATS_COLLECTION)
+                 .order_by(order_by, direction=firestore.Query.DESCENDING).limit(limit))
+        with dependency("firestore").guard(), track_external("firestore", "stats_list"):
+            return [doc.to_dict() for doc in query.stream()]
+
+    def unsummarized(self, limit: int = 20, scan_window: int = 500) -> List[dict]:
+        """Flagged ingredients without a brief, most scanned first
+
+        Stats documents only learn about briefs stored after they were created, so
+        candidates not yet marked are checked against the summaries collection and
+        marked when a brief turns out to exist.
+        """
+        queue = []
+        for stats in self.top_ingredients(scan_window):
+            if stats.get("has_brief") or not stats.get("products", 0) > 0:
+                continue
+            # Briefs are stored under the raw name, so one Firestore would reject can never be generated
+            if not valid_document_id(stats["name"]):
+                continue
+            with dependency("firestore").guard(), track_external("firestore", "summary_get"):
+                summarized = self.db.collection(SUMMARIES_COLLECTION).document(stats["name"]).get().exists
+            if summarized:
+                self.mark_summarized(stats["name"])
+                continue
+            queue.append(stats)
+            if len(queue) >= limit:
+                break
+        return queue
+
+
+def top_pairs(stats: Iterable[dict], limit: int = 20) -> List[dict]:
+    """Most frequent co-occurring pairs among the given stats documents"""
+    pairs = {}
+    for entry in stats:
+        for other, count in (entry.get("cooccurrence") or {}).items():
+            key = tuple(sorted((entry["name"], other)))
+            if count > 0:
+                pairs[key] = count
+    ranked = sorted(pairs.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"ingredients": list(key), "products": count} for key, count in ranked]
+
+
+ingredient_stats = IngredientStats()
@@ -0,0 +1,164 @@
+"""
+Hot-path instrumentation
+Prometheus metrics for stage latency, external calls and cache hit ratios,
+plus per-request timing logs through structlog
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import structlog
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Buckets cover everything from an in-memory regex pass to a slow Gemini call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "vireo_request_latency_seconds",
+    "End-to-end latency of HTTP requests",
+    ["method", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "vireo_stage_latency_seconds",
+    "Latency of individual stages inside a request or background job",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_LATENCY = Histogram(
+    "vireo_external_call_latency_seconds",
+    "Latency of calls to external dependencies",
+    ["dependency", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALLS = Counter(
+    "vireo_external_calls_total",
+    "Calls made to external dependencies (OpenFoodFacts, NCBI, Gemini, Firestore)",
+    ["dependency", "operation"],
+)
+EXTERNAL_ERRORS = Counter(
+    "vireo_external_errors_total",
+    "Failed calls to external dependencies",
+    ["dependency", "operation"],
+)
+CACHE_REQUESTS = Counter(
+    "vireo_cache_requests_total",
+    "Cache lookups by outcome",
+    ["cache", "result"],
+)
+CACHE_HIT_RATIO = Gauge(
+    "vireo_cache_hit_ratio",
+    "Hit ratio of each cache since process start",
+    ["cache"],
+    multiprocess_mode="liveall",
+)
+CIRCUIT_STATE = Gauge(
+    "vireo_circuit_state",
+    "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+BRIEF_PROMPT_TOKENS = Histogram(
+    "vireo_brief_prompt_tokens",
+    "Estimated size of research brief prompts sent to Gemini",
+    buckets=(250, 500, 750, 1000, 1250, 1500, 2000, 3000, 5000),
+)
+DEPENDENCY_REJECTIONS = Counter(
+    "vireo_dependency_rejections_total",
+    "Calls rejected without reaching a dependency (open circuit, full bulkhead, load shedding)",
+    ["dependency", "reason"],
+)
+
+# Running totals behind CACHE_HIT_RATIO: cache name -> [hits, lookups]
+_cache_totals: Dict[str, list] = {}
+
+# Stage timings collected for the request currently being served (None outside a request)
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("vireo_request_timings", default=None)
+
+request_logger = structlog.get_logger("vireo.requests")
+
+
+def configure_logging() -> None:
+    """Configure structlog to emit one JSON line per event"""
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(),
+        ],
+        cache_logger_on_first_use=True,
+    )
+
+
+def begin_request():
+    """Start collecting stage timings for the current request"""
+    return _request_timings.set({})
+
+
+def end_request(token) -> Dict[str, float]:
+    """Stop collecting stage timings and return what was recorded (in milliseconds)"""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration in the histogram and the current request's timing log"""
+    STAGE_LATENCY.labels(stage=stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = round(timings.get(stage, 0.0) + seconds * 1000, 3)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Time the enclosed block as a named stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def track_external(dependency: str, operation: str):
+    """Count, time and record errors for a call to an external dependency"""
+    EXTERNAL_CALLS.labels(dependency=dependency, operation=operation).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_ERRORS.labels(dependency=dependency, operation=operation).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        EXTERNAL_CALL_LATENCY.labels(dependency=dependency, operation=operation).observe(elapsed)
+        observe_stage(f"{dependency}.{operation}", elapsed)
+
+
+def record_external_error(dependency: str, operation: str) -> None:
+    """Record a failed external call that did not raise (e.g. a 5xx response)"""
+    EXTERNAL_ERRORS.labels(dependency=dependency, operation=operation).inc()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Record a cache lookup and refresh the cache's hit ratio"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+    totals = _cache_totals.setdefault(cache, [0, 0])
+    totals[0] += 1 if hit else 0
+    totals[1] += 1
+    CACHE_HIT_RATIO.labels(cache=cache).set(totals[0] / totals[1])
+
+
+def render_metrics():
+    """Render all metrics in the Prometheus text exposition format"""
+    # Under gunicorn every worker writes its own files; aggregate them so any worker can answer a scrape
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
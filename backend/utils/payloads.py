@@ -0,0 +1,181 @@
+"""
+Pre-serialized response payloads
+Scan and brief responses are encoded with orjson once and kept alongside their
+gzip and brotli variants, so a cache hit is written out as stored bytes
+"""
+
+import gzip
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional
+
+import brotli
+import orjson
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend.utils.metrics import record_cache
+from backend.utils.shared_cache import SharedCache, shared_cache
+
+# Bodies smaller than this are sent as-is; compression overhead outweighs the saving
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = 6
+# Cached payloads are compressed once and served many times, so brotli can afford a high quality
+BROTLI_QUALITY = 9
+
+PAYLOAD_CACHE_ENTRIES = int(os.getenv("PAYLOAD_CACHE_ENTRIES", 2048))
+PAYLOAD_CACHE_TTL = float(os.getenv("PAYLOAD_CACHE_TTL", 600))
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _default(value):
+    # Firestore returns timestamps as datetime subclasses, which orjson refuses
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any, sort_keys: bool = False) -> bytes:
+    """Serialize with orjson, accepting Firestore timestamps and pydantic models"""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return orjson.dumps(content, default=_default, option=option)
+
+
+@dataclass
+class EncodedPayload:
+    """A serialized body with its pre-compressed variants (None when too small to compress)"""
+    body: bytes
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+    fingerprint: str = ""
+    expires_at: float = 0.0
+    media_type: str = JSON_MEDIA_TYPE
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzip or b"") + len(self.br or b"")
+
+
+def encode_payload(content: Any, fingerprint: str = "", ttl: float = PAYLOAD_CACHE_TTL) -> EncodedPayload:
+    """Serialize `content` once and compress it for every encoding we negotiate"""
+    return encode_body(dumps(content), fingerprint, ttl)
+
+
+def encode_body(body: bytes, fingerprint: str = "", ttl: float = PAYLOAD_CACHE_TTL,
+                media_type: str = JSON_MEDIA_TYPE) -> EncodedPayload:
+    """Compress an already serialized body for every encoding we negotiate"""
+    payload = EncodedPayload(body=body, fingerprint=fingerprint, expires_at=time.monotonic() + ttl,
+                             media_type=media_type)
+    if len(body) >= COMPRESS_MIN_BYTES:
+        mode = brotli.MODE_TEXT if media_type == JSON_MEDIA_TYPE else brotli.MODE_GENERIC
+        payload.gzip = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        payload.br = brotli.compress(body, mode=mode, quality=BROTLI_QUALITY)
+    return payload
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token] = quality
+    for encoding in ("br", "gzip"):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def payload_response(payload: EncodedPayload, request: Request, status_code: int = 200) -> Response:
+    """Serve stored bytes, picking the best pre-compressed variant the client accepts"""
+    headers = {"Vary": "Accept-Encoding"}
+    body = payload.body
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", "")) if payload.gzip else None
+    if encoding == "br":
+        body = payload.br
+        headers["Content-Encoding"] = "br"
+    elif encoding == "gzip":
+        body = payload.gzip
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type=payload.media_type, headers=headers)
+
+
+class PayloadCache:
+    """Bounded LRU of encoded payloads with a TTL, backed by the cross-worker shared cache
+
+    Entries carry a fingerprint of whatever they were built from; a lookup with a
+    different fingerprint is a miss, so callers never have to invalidate explicitly
+    when the inputs change.
+    """
+
+    def __init__(self, name: str, max_entries: int = PAYLOAD_CACHE_ENTRIES, ttl: float = PAYLOAD_CACHE_TTL,
+                 shared: SharedCache = shared_cache):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self._entries: "OrderedDict[str, EncodedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, fingerprint: str = "") -> Optional[EncodedPayload]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None and (payload.fingerprint != fingerprint or payload.expires_at <= time.monotonic()):
+                del self._entries[key]
+                payload = None
+            if payload is not None:
+                self._entries.move_to_end(key)
+        if payload is None:
+            # Another worker may already have encoded it
+            payload = self.shared.get(self.name, key, fingerprint)
+            if payload is not None:
+                payload.expires_at = time.monotonic() + self.ttl
+                self._store(key, payload)
+        record_cache(self.name, payload is not None)
+        return payload
+
+    def put(self, key: str, content: Any, fingerprint: str = "") -> EncodedPayload:
+        """Encode `content` and store it; returns the payload so the caller can serve it"""
+        return self.put_payload(key, encode_payload(content, fingerprint, self.ttl))
+
+    def put_payload(self, key: str, payload: EncodedPayload) -> EncodedPayload:
+        """Store an already encoded payload (e.g. from encode_body)"""
+        self._store(key, payload)
+        self.shared.put(self.name, key, payload, payload.fingerprint, self.ttl)
+        return payload
+
+    def _store(self, key: str, payload: EncodedPayload) -> None:
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        self.shared.invalidate(self.name, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+scan_payloads = PayloadCache("scan_payload")
+brief_payloads = PayloadCache("brief_payload")
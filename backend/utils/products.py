@@ -0,0 +1,269 @@
+"""
+Product storage with ingredient change detection
+Products are fetched from OpenFoodFacts and stored with a hash of their normalized
+ingredient list and which of those ingredients were flagged, so a refetch skips
+the ingredients already known to be clean and records what changed
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from firebase_admin import firestore
+
+from backend.firebase_init import db
+from backend.utils.ingredient_service import IngredientFlag, IngredientService
+from backend.utils.ingredient_stats import ingredient_stats
+from backend.utils.metrics import record_cache, time_stage, track_external
+from backend.utils.resilience import dependency
+
+logger = logging.getLogger(__name__)
+
+# Base URL of OpenFoodFacts (overridable so benchmarks can point at a local stand-in)
+OFF_BASE_URL = os.getenv("OFF_BASE_URL", "https://world.openfoodfacts.org")
+OFF_TIMEOUT = float(os.getenv("OFF_TIMEOUT", 10))
+
+# Fields of a product document that come from OpenFoodFacts and are returned to clients
+PRODUCT_FIELDS = ["barcode", "name", "brand", "packaging_material", "packaging_recyclable", "nutriscore",
+                  "eco_score_level", "ingredients_text", "ingredients", "image_url"]
+
+# OFF fields needed to build a product, requested explicitly from the bulk search API
+OFF_FIELDS = ["code", "product_name", "brands", "packaging", "packaging_recycling", "nutriscore_grade",
+              "environment_impact_level_tags", "ingredients_text", "ingredients", "image_url"]
+
+CHANGES_COLLECTION = "ingredient_changes"
+
+# Barcodes per OFF bulk request; OFF serves at most 100 products per search page
+REFRESH_BATCH_SIZE = 50
+REFRESH_MAX_AGE_HOURS = float(os.getenv("PRODUCT_REFRESH_MAX_AGE_HOURS", 24))
+# Products read per page while looking for stale ones, and at most how many are read per run
+REFRESH_PAGE_SIZE = 500
+REFRESH_SCAN_LIMIT = int(os.getenv("PRODUCT_REFRESH_SCAN_LIMIT", 20000))
+
+
+def fetch_off_product(barcode: str) -> Optional[dict]:
+    """Fetch a product from OpenFoodFacts; returns None when OFF does not know the barcode"""
+    OFF_URL = f"{OFF_BASE_URL}/api/v0/product/{barcode}.json"
+    with dependency("openfoodfacts").guard(), track_external("openfoodfacts", "product"):
+        res = requests.get(OFF_URL, timeout=OFF_TIMEOUT)
+        # Only server-side trouble counts against the circuit; 404s are a normal answer
+        if res.status_code >= 500 or res.status_code == 429:
+            res.raise_for_status()
+
+    if res.status_code != 200 or res.json().get("status") == 0:
+        return None
+    return res.json()["product"]
+
+
+def fetch_off_products(barcodes: List[str]) -> Dict[str, dict]:
+    """Fetch many products in one OpenFoodFacts search request; unknown barcodes are left out"""
+    with dependency("openfoodfacts").guard(), track_external("openfoodfacts", "bulk_product"):
+        res = requests.get(f"{OFF_BASE_URL}/api/v2/search", params={
+            "code": ",".join(barcodes),
+            "fields": ",".join(OFF_FIELDS),
+            "page_size": len(barcodes),
+        }, timeout=OFF_TIMEOUT * 3)
+        res.raise_for_status()
+    return {product["code"]: product for product in res.json().get("products", []) if product.get("code")}
+
+
+def product_from_off(barcode: str, off_data: dict) -> dict:
+    """Shape an OpenFoodFacts product into our product document"""
+    return {
+        "barcode": barcode,
+        "name": off_data.get("product_name"),
+        "brand": off_data.get("brands"),
+        "packaging_material": off_data.get("packaging"),
+        "packaging_recyclable": off_data.get("packaging_recycling") == "yes",
+        "nutriscore": off_data.get("nutriscore_grade"),
+        "eco_score_level": off_data.get("environment_impact_level_tags"),
+        "ingredients_text": off_data.get("ingredients_text"),
+        "ingredients": off_data.get("ingredients", []),
+        "image_url": off_data.get("image_url")
+    }
+
+
+def public_product(product: dict) -> dict:
+    """Strip change-tracking fields from a stored product"""
+    return {field: product.get(field) for field in PRODUCT_FIELDS}
+
+
+def ingredient_tokens(ingredients_text: Optional[str]) -> List[str]:
+    """Normalized ingredient names, split and cleaned exactly as flagging does"""
+    return [token.lower().strip() for token in (ingredients_text or "").split(",") if token.strip()]
+
+
+def ingredients_hash(tokens: List[str]) -> str:
+    """Order-insensitive hash of an ingredient list; reordering a label is not a change"""
+    return hashlib.sha256("\n".join(sorted(set(tokens))).encode()).hexdigest()[:32]
+
+
+@dataclass
+class IngredientChange:
+    """What changed between two versions of a product's ingredient list"""
+    previous_hash: str
+    hash: str
+    added: List[str]
+    removed: List[str]
+
+
+def diff_ingredients(previous_tokens: List[str], tokens: List[str]) -> IngredientChange:
+    previous, current = set(previous_tokens), set(tokens)
+    return IngredientChange(
+        previous_hash=ingredients_hash(previous_tokens),
+        hash=ingredients_hash(tokens),
+        added=sorted(current - previous),
+        removed=sorted(previous - current),
+    )
+
+
+class ProductService:
+    """Stores fetched products, reusing earlier flags and recording ingredient changes"""
+
+    def __init__(self, ingredient_service: IngredientService, stats=ingredient_stats):
+        self.db = db
+        self.ingredient_service = ingredient_service
+        self.stats = stats
+
+    async def stored_scan(self, stored: dict) -> List[IngredientFlag]:
+        """Flags for serving a stored copy without refetching it, reusing saved flags when still current"""
+        version = (await self.ingredient_service.get_watchlist_index()).version
+        known = self._known_flags(stored, version)
+        record_cache("product_flags", known is not None)
+        flags = await self.ingredient_service.flag_ingredients_in_text(stored.get("ingredients_text") or "", known)
+        names = [flag.ingredient_name for flag in flags]
+        self.stats.record(names, previous=names)
+        return flags
+
+    def _known_flags(self, stored: Optional[dict], version: int) -> Optional[Dict[str, Optional[IngredientFlag]]]:
+        """Ingredients known not to be flagged at `version`, or None when the stored state is out of date
+
+        Flagged ingredients are left out so their details are read from the current watchlist.
+        """
+        state = (stored or {}).get("flag_state")
+        if not state or state.get("watchlist_version") != version or "tokens" not in state:
+            return None
+        flagged = set(state["tokens"])
+        return {token: None for token in ingredient_tokens(stored.get("ingredients_text")) if token not in flagged}
+
+    async def record_fetch(self, barcode: str, product_data: dict, stored: Optional[dict],
+                           source: str = "scan") -> Tuple[List[IngredientFlag], Optional[IngredientChange]]:
+        """Store a freshly fetched product and return its flags
+
+        Only ingredients that were not in the stored list are flagged again. A
+        change to the ingredient list is recorded under
+        products/{barcode}/ingredient_changes, and the OpenFoodFacts fields are only
+        rewritten when something in them actually changed.
+        """
+        tokens = ingredient_tokens(product_data.get("ingredients_text"))
+        digest = ingredients_hash(tokens)
+        # Stamp the version read before flagging, so a concurrent watchlist change forces a full re-flag next time
+        version = (await self.ingredient_service.get_watchlist_index()).version
+        known = self._known_flags(stored, version)
+        record_cache("product_flags", known is not None)
+
+        with time_stage("product.flag"):
+            flags = await self.ingredient_service.flag_ingredients_in_text(
+                product_data.get("ingredients_text") or "", known)
+
+        change = None
+        if stored is not None:
+            previous_hash = stored.get("ingredients_hash") or ingredients_hash(ingredient_tokens(stored.get("ingredients_text")))
+            if previous_hash != digest:
+                change = diff_ingredients(ingredient_tokens(stored.get("ingredients_text")), tokens)
+
+        now = datetime.now(timezone.utc)
+        update = {
+            "ingredients_hash": digest,
+            "flag_state": {
+                "watchlist_version": version,
+                "tokens": sorted({flag.ingredient_name.lower().strip() for flag in flags}),
+            },
+            "last_fetched_at": now,
+        }
+        if stored is None or any(stored.get(field) != product_data.get(field) for field in PRODUCT_FIELDS):
+            update.update(product_data)
+        if source == "scan":
+            update["scan_count"] = firestore.Increment(1)
+            update["last_scanned_at"] = now
+
+        product_ref = self.db.collection("products").document(barcode)
+        with dependency("firestore").guard(), track_external("firestore", "product_set"):
+            product_ref.set(update, merge=True)
+            if change:
+                product_ref.collection(CHANGES_COLLECTION).document().set({
+                    **asdict(change), "source": source, "changed_at": now,
+                })
+        if change:
+            logger.info(f"Ingredients of {barcode} changed: +{len(change.added)} -{len(change.removed)}")
+        
+        previous_flags = None
+        if stored is not None and stored.get("flag_state"):
+            previous_flags = stored["flag_state"].get("tokens")
+        self.stats.record([flag.ingredient_name for flag in flags], previous_flags, scanned=source == "scan")
+        return flags, change
+
+    async def get_change_history(self, barcode: str, limit: int = 20) -> List[dict]:
+        """Most recent ingredient changes of a product, newest first"""
+        query = (self.db.collection("products").document(barcode).collection(CHANGES_COLLECTION)
+                 .order_by("changed_at", direction=firestore.Query.DESCENDING).limit(limit))
+        with dependency("firestore").guard(), track_external("firestore", "product_changes"):
+            return [doc.to_dict() for doc in query.stream()]
+
+    async def refresh_stale_products(self, limit: int = 200, max_age_hours: float = REFRESH_MAX_AGE_HOURS,
+                                     batch_size: int = REFRESH_BATCH_SIZE,
+                                     scan_limit: int = REFRESH_SCAN_LIMIT) -> Dict[str, int]:
+        """Refetch the `limit` most scanned products whose stored copy is older than `max_age_hours`
+
+        Products are read in scan order, paging past fresh ones, until `limit`
+        stale products are found or `scan_limit` products have been read. They are
+        fetched from OpenFoodFacts in bulk, `batch_size` barcodes per request.
+        Unchanged products only get their fetch time bumped.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        query = self.db.collection("products").order_by("scan_count", direction=firestore.Query.DESCENDING)
+        stale = {}
+        read, last = 0, None
+        while len(stale) < limit and read < scan_limit:
+            page_query = query.start_after(last) if last is not None else query
+            with dependency("firestore").guard(), track_external("firestore", "product_list"):
+                docs = list(page_query.limit(min(REFRESH_PAGE_SIZE, scan_limit - read)).stream())
+            for doc in docs:
+                product = doc.to_dict() or {}
+                if len(stale) < limit and (not product.get("last_fetched_at") or product["last_fetched_at"] < cutoff):
+                    stale[doc.id] = product
+            read += len(docs)
+            if len(docs) < REFRESH_PAGE_SIZE:
+                break
+            last = docs[-1]
+
+        summary = {"checked": len(stale), "changed": 0, "unchanged": 0, "missing": 0, "failed": 0, "batches": 0}
+        barcodes = list(stale)
+        for start in range(0, len(barcodes), batch_size):
+            batch = barcodes[start:start + batch_size]
+            summary["batches"] += 1
+            try:
+                fetched = await asyncio.to_thread(fetch_off_products, batch)
+            except Exception as e:
+                logger.error(f"Error refreshing products {batch[0]}..{batch[-1]}: {e}")
+                summary["failed"] += len(batch)
+                continue
+            for barcode in batch:
+                if barcode not in fetched:
+                    summary["missing"] += 1
+                    continue
+                try:
+                    product_data = product_from_off(barcode, fetched[barcode])
+                    _, change = await self.record_fetch(barcode, product_data, stale[barcode], source="refresh")
+                except Exception as e:
+                    # One bad product must not stop the rest of the run
+                    logger.error(f"Error storing refreshed product {barcode}: {e}")
+                    summary["failed"] += 1
+                    continue
+                summary["changed" if change else "unchanged"] += 1
+        return summary
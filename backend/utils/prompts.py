@@ -0,0 +1,151 @@
+"""
+Token-budgeted prompts for research brief generation
+Abstracts are compressed extractively, keeping the sentences that mention the
+ingredient and safety outcomes, so every Gemini prompt fits one budget no
+matter how verbose the retrieved papers are
+"""
+
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Bump whenever the template or the selection changes; stored with briefs and part of brief cache keys
+PROMPT_VERSION = "brief-v2"
+
+# Estimated tokens for the whole prompt, template included
+PROMPT_TOKEN_BUDGET = int(os.getenv("BRIEF_PROMPT_TOKENS", 1200))
+# Gemini averages about four characters of English per token
+CHARS_PER_TOKEN = 4
+
+BRIEF_TEMPLATE = """
+You are a food science expert analyzing current research.
+
+Based on the abstract excerpts below, give advice to a potential consumer about the health risks of the food ingredient '{ingredient}'. Keep it under 200 words.
+
+If there is public concern but evidence suggests safety, say "despite concerns, research suggests...". Be honest about uncertainty. Use simple language.
+
+Research abstracts:
+{context}
+"""
+
+# Words that mark a sentence as reporting a safety or health outcome
+OUTCOME_TERMS = (
+    "safe", "safety", "toxic", "toxicity", "adverse", "risk", "risks", "harm", "harmful", "cancer",
+    "carcinogen", "carcinogenic", "tumor", "tumour", "genotoxic", "mortality", "disease", "dose",
+    "intake", "exposure", "adi", "noael", "allergy", "allergic", "inflammation", "metabolic",
+    "associated", "association", "increased", "reduced", "significant", "evidence",
+)
+# Words that mark a sentence as a finding rather than background
+CONCLUSION_TERMS = ("conclude", "concluded", "conclusion", "conclusions", "suggest", "suggests", "indicate",
+                    "indicates", "found", "results", "showed", "demonstrated")
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, erring high so a prompt never lands over budget"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_BREAK.split(text or "") if sentence.strip()]
+
+
+def score_sentence(sentence: str, ingredient: str) -> float:
+    """Relevance of a sentence to a consumer brief: ingredient mentions, safety outcomes, findings"""
+    lowered = sentence.lower()
+    words = set(_WORD.findall(lowered))
+    score = 0.0
+    name = ingredient.lower().strip()
+    if name and (name in lowered or name.replace(" ", "") in lowered.replace(" ", "")):
+        score += 3.0
+    score += min(3, sum(1 for term in OUTCOME_TERMS if term in words))
+    if any(term in words for term in CONCLUSION_TERMS):
+        score += 1.0
+    return score
+
+
+def _truncate(text: str, tokens: int) -> str:
+    """Cut text to roughly `tokens` tokens at a word boundary"""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:max(0, limit - 1)].rsplit(" ", 1)[0] + "…"
+
+
+@dataclass
+class BriefPrompt:
+    text: str
+    version: str
+    tokens: int
+    papers: int
+    sentences_kept: int
+    sentences_total: int
+
+
+def compress_abstracts(ingredient: str, papers: List[Dict], budget: int) -> Tuple[str, int, int]:
+    """Pick the most relevant abstract sentences that fit `budget` tokens
+
+    Every paper first gets its title and its best sentence, then the remaining
+    budget goes to the best sentences overall. Kept sentences stay in their
+    original order. Returns the context and the kept/total sentence counts.
+    """
+    titles = [paper.get("title") or "No title" for paper in papers]
+    sentences = [split_sentences(paper.get("abstract") or "") for paper in papers]
+    total = sum(len(paper_sentences) for paper_sentences in sentences)
+
+    # Titles always go in; a very long title is cut rather than crowding out every abstract
+    title_budget = max(1, budget // (2 * max(1, len(papers))))
+    titles = [_truncate(title, title_budget) for title in titles]
+    remaining = budget - sum(estimate_tokens(f"{title}:\n") + 1 for title in titles)
+
+    ranked = []
+    for paper_sentences in sentences:
+        scored = sorted(((score_sentence(sentence, ingredient), -i, i) for i, sentence in enumerate(paper_sentences)),
+                        reverse=True)
+        ranked.append([(score, i) for score, _, i in scored])
+
+    kept: List[Dict[int, str]] = [{} for _ in papers]
+
+    def take(p: int, i: int) -> bool:
+        nonlocal remaining
+        cost = estimate_tokens(sentences[p][i]) + 1
+        if cost <= remaining:
+            kept[p][i] = sentences[p][i]
+            remaining -= cost
+            return True
+        return False
+
+    # Best sentence of each paper, cut down to an even share of the budget so no paper crowds out the others
+    share = remaining // max(1, len(papers))
+    for p, paper_ranked in enumerate(ranked):
+        if not paper_ranked or share < 2:
+            continue
+        _, i = paper_ranked[0]
+        if estimate_tokens(sentences[p][i]) + 1 > share:
+            sentences[p][i] = _truncate(sentences[p][i], share - 1)
+        take(p, i)
+
+    # Then the best of the rest across all papers
+    rest = sorted(((score, -p, -i) for p, paper_ranked in enumerate(ranked) for score, i in paper_ranked[1:]),
+                  reverse=True)
+    for _, neg_p, neg_i in rest:
+        take(-neg_p, -neg_i)
+
+    context = "\n\n".join(
+        f"{title}:\n" + " ".join(kept[p][i] for i in sorted(kept[p]))
+        for p, title in enumerate(titles)
+    )
+    return context, sum(len(paper_kept) for paper_kept in kept), total
+
+
+def build_brief_prompt(ingredient: str, papers: List[Dict], budget: int = PROMPT_TOKEN_BUDGET) -> BriefPrompt:
+    """Brief prompt for `ingredient` whose estimated size stays within `budget` tokens"""
+    overhead = estimate_tokens(BRIEF_TEMPLATE.format(ingredient=ingredient, context=""))
+    context, kept, total = compress_abstracts(ingredient, papers, max(0, budget - overhead))
+    text = BRIEF_TEMPLATE.format(ingredient=ingredient, context=context)
+    return BriefPrompt(text=text, version=PROMPT_VERSION, tokens=estimate_tokens(text), papers=len(papers),
+                       sentences_kept=kept, sentences_total=total)
@@ -1,49 +1,69 @@
 import requests
 import google.generativeai as genai
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from xml.etree import ElementTree
+from backend.utils.metrics import BRIEF_PROMPT_TOKENS, time_stage, track_external
+from backend.utils.prompts import BriefPrompt, build_brief_prompt
+from backend.utils.resilience import dependency
 
 load_dotenv()
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# Base URL of the NCBI E-utilities (overridable so benchmarks can point at a local stand-in)
+NCBI_BASE_URL = os.getenv("NCBI_BASE_URL", "https://eutils.ncbi.nlm.nih.gov/entrez/eutils")
+
+if os.getenv("GEMINI_API_ENDPOINT"):
+    genai.configure(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        transport="rest",
+        client_options={"api_endpoint": os.getenv("GEMINI_API_ENDPOINT")},
+    )
+else:
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 def retrieve_pubmed_studies(ingredient: str, limit=5) -> list[dict]:
     # Improved search query focusing on safety and health effects
     search_term = f'({ingredient}) AND (safety OR toxicity OR "adverse effects" OR "health effects" OR "meta-analysis" OR "systematic review")'
     
     # Step 1: Search for PubMed IDs with improved query
-    search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+    search_url = f"{NCBI_BASE_URL}/esearch.fcgi"
     search_params = {
         "db": "pubmed",
         "term": search_term,
         "retmode": "json",
         "retmax": limit,
     }
-    search_response = requests.get(search_url, params=search_params)
+    with dependency("ncbi").guard(), track_external("ncbi", "esearch"):
+        search_response = requests.get(search_url, params=search_params, timeout=15)
+        search_response.raise_for_status()
     id_list = search_response.json().get("esearchresult", {}).get("idlist", [])
 
     if not id_list:
         return []
 
     # Step 2: Fetch abstracts
-    fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+    fetch_url = f"{NCBI_BASE_URL}/efetch.fcgi"
     fetch_params = {
         "db": "pubmed",
         "id": ",".join(id_list),
         "retmode": "xml",
     }
-    fetch_response = requests.get(fetch_url, params=fetch_params)
-    root = ElementTree.fromstring(fetch_response.content)
+    with dependency("ncbi").guard(), track_external("ncbi", "efetch"):
+        fetch_response = requests.get(fetch_url, params=fetch_params, timeout=15)
+        fetch_response.raise_for_status()
+    with time_stage("pubmed.parse"):
+        root = ElementTree.fromstring(fetch_response.content)
 
     results = []
     ingredient_lower = ingredient.lower()
     
     for article in root.findall(".//PubmedArticle"):
         title_el = article.find(".//ArticleTitle")
-        abstract_el = article.find(".//Abstract/AbstractText")
-        title = title_el.text if title_el is not None else "No title"
-        abstract = abstract_el.text if abstract_el is not None else "No abstract"
+        # Structured abstracts split into several sections; conclusions usually come last
+        abstract_parts = ["".join(el.itertext()).strip() for el in article.findall(".//Abstract/AbstractText")]
+        title = "".join(title_el.itertext()) if title_el is not None else "No title"
+        abstract = " ".join(part for part in abstract_parts if part) or "No abstract"
         
         # Simple abstract filtering: skip if ingredient not clearly mentioned
         title_lower = title.lower()
@@ -64,33 +84,33 @@ def retrieve_pubmed_studies(ingredient: str, limit=5) -> list[dict]:
 
     return results
 
-def rag_analysis(ingredient: str):
-    papers = retrieve_pubmed_studies(ingredient)
-
-    if not papers:
-        return f"No relevant research found for {ingredient}."
+def build_prompt(ingredient: str, papers: list[dict]) -> BriefPrompt:
+    """Shared prompt stage for both entry points, within the brief token budget"""
+    with time_stage("brief.prompt"):
+        prompt = build_brief_prompt(ingredient, papers)
+    BRIEF_PROMPT_TOKENS.observe(prompt.tokens)
+    return prompt
 
-    context = "\n\n".join(
-        f"{paper['title']}:\n{paper.get('abstract', 'No abstract available.')}"
-        for paper in papers
-    )
-
-    prompt = f"""
-You are a food science expert analyzing current research.
-
-Based on the abstracts below, give advice to a potential consumer about the health risks of the food ingredient '{ingredient}'? 
+def generate_brief(prompt: BriefPrompt) -> str:
+    model = genai.GenerativeModel("gemini-1.5-flash")
+    with dependency("gemini").guard(), track_external("gemini", "generate_content"):
+        response = model.generate_content(prompt.text)
+    return response.text
 
-If there is public concern but evidence suggests safety, say "despite concerns, research suggests...". Be honest about uncertainty. Use simple language.
+def no_research_found(ingredient: str) -> str:
+    return f"No relevant research found for {ingredient}."
 
-Research abstracts:
-{context}
-"""
+def is_research_brief(ingredient: str, summary: Optional[str]) -> bool:
+    """False for the placeholder used when PubMed has nothing and for empty generations"""
+    return bool(summary and summary.strip()) and summary != no_research_found(ingredient)
 
-    model = genai.GenerativeModel("gemini-1.5-flash")
+def rag_analysis(ingredient: str):
+    papers = retrieve_pubmed_studies(ingredient)
 
-    response = model.generate_content(prompt)
+    if not papers:
+        return no_research_found(ingredient)
 
-    return response.text
+    return generate_brief(build_prompt(ingredient, papers))
 
 async def rag_analysis_with_progress(ingredient: str, progress_dict: dict):
     """RAG analysis with progress updates"""
@@ -104,10 +124,11 @@ async def rag_analysis_with_progress(ingredient: str, progress_dict: dict):
     
     # Run PubMed search in thread pool to avoid blocking
     loop = asyncio.get_event_loop()
-    papers = await loop.run_in_executor(None, retrieve_pubmed_studies, ingredient)
+    with time_stage("brief.pubmed"):
+        papers = await loop.run_in_executor(None, retrieve_pubmed_studies, ingredient)
 
     if not papers:
-        return f"No relevant research found for {ingredient}."
+        return no_research_found(ingredient)
 
     # Update progress: generating summary
     progress_dict[ingredient] = {
@@ -115,27 +136,9 @@ async def rag_analysis_with_progress(ingredient: str, progress_dict: dict):
         "message": "Generating research summary..."
     }
 
-    context = "\n\n".join(
-        f"{paper['title']}:\n{paper.get('abstract', 'No abstract available.')}"
-        for paper in papers
-    )
-
-    prompt = f"""
-You are a food science expert analyzing current research.
-
-Based on the abstracts below, give advice to a potential consumer about the health risks of the food ingredient '{ingredient}'? 
-
-If there is public concern but evidence suggests safety, say "despite concerns, research suggests...". Be honest about uncertainty. Use simple language.
-
-Research abstracts:
-{context}
-"""
+    prompt = build_prompt(ingredient, papers)
 
     # Run Gemini generation in thread pool
-    def generate_content():
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
-    
-    summary = await loop.run_in_executor(None, generate_content)
+    with time_stage("brief.gemini"):
+        summary = await loop.run_in_executor(None, generate_brief, prompt)
     return summary
@@ -0,0 +1,206 @@
+"""
+Circuit breakers, bulkheads and admission control for external dependencies
+Each dependency (OpenFoodFacts, NCBI, Gemini, Firestore) gets bounded concurrency
+and a breaker that fails fast while the dependency is unhealthy
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import MovingWindowRateLimiter
+
+from backend.utils.metrics import CIRCUIT_STATE, DEPENDENCY_REJECTIONS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class DependencyUnavailable(Exception):
+    """Raised instead of calling a dependency whose circuit is open or whose bulkhead is full"""
+
+    def __init__(self, dependency: str, reason: str, retry_after: float):
+        super().__init__(f"{dependency} unavailable: {reason}")
+        self.dependency = dependency
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Classic three-state breaker: opens after consecutive failures, probes after a cool-down"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(dependency=name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; in half-open state only one probe is let through"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot without recording an outcome"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_STATE.labels(dependency=self.name).set(_STATE_VALUES[state])
+
+
+class Dependency:
+    """A breaker plus a bulkhead (bounded concurrency) for one external dependency"""
+
+    def __init__(self, name: str, max_concurrency: int, acquire_timeout: float = 0.5,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.acquire_timeout = acquire_timeout
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def available(self) -> bool:
+        """True unless the circuit is open (a half-open circuit will accept a probe)"""
+        return self.breaker.state != OPEN
+
+    def _acquire_slot(self) -> bool:
+        """Take a bulkhead slot; on an event loop thread never wait, since that would stall every request"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._slots.acquire(timeout=self.acquire_timeout)
+        return self._slots.acquire(blocking=False)
+
+    @contextmanager
+    def guard(self):
+        """Run the enclosed call under the breaker and bulkhead, failing fast when either rejects it"""
+        if not self.breaker.allow():
+            DEPENDENCY_REJECTIONS.labels(dependency=self.name, reason="circuit_open").inc()
+            raise DependencyUnavailable(self.name, "circuit open", self.breaker.retry_after())
+        if not self._acquire_slot():
+            # Not the dependency's fault, so the breaker is not charged
+            self.breaker.release_probe()
+            DEPENDENCY_REJECTIONS.labels(dependency=self.name, reason="bulkhead_full").inc()
+            raise DependencyUnavailable(self.name, "too many concurrent requests", 1.0)
+        try:
+            yield
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            self._slots.release()
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+# NCBI allows 3 requests/second without an API key, so its bulkhead is the tightest
+DEPENDENCIES: Dict[str, Dependency] = {
+    "openfoodfacts": Dependency("openfoodfacts", _env_int("OFF_MAX_CONCURRENCY", 8)),
+    "ncbi": Dependency("ncbi", _env_int("NCBI_MAX_CONCURRENCY", 3), acquire_timeout=2.0),
+    "gemini": Dependency("gemini", _env_int("GEMINI_MAX_CONCURRENCY", 4), acquire_timeout=2.0),
+    "firestore": Dependency("firestore", _env_int("FIRESTORE_MAX_CONCURRENCY", 32), acquire_timeout=1.0,
+                            failure_threshold=10, reset_timeout=10.0),
+}
+
+
+def dependency(name: str) -> Dependency:
+    return DEPENDENCIES[name]
+
+
+class GenerationAdmission:
+    """Admission control for expensive brief generations
+
+    Cached reads never pass through here; only requests that would start a new
+    PubMed + Gemini generation are rate limited per client and capped globally.
+    """
+
+    def __init__(self, max_in_flight: int, per_client_limit: str):
+        self.max_in_flight = max_in_flight
+        self._rate = parse(per_client_limit)
+        self._limiter = MovingWindowRateLimiter(MemoryStorage())
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_admit(self, client_key: str) -> Optional[str]:
+        """Reserve a generation slot; returns a rejection reason, or None when admitted"""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                DEPENDENCY_REJECTIONS.labels(dependency="generation", reason="capacity").inc()
+                return "Too many research briefs are being generated right now"
+            if not self._limiter.hit(self._rate, "brief_generation", client_key):
+                DEPENDENCY_REJECTIONS.labels(dependency="generation", reason="rate_limited").inc()
+                return "Too many new research briefs requested, please try again shortly"
+            self._in_flight += 1
+            return None
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+
+generation_admission = GenerationAdmission(
+    max_in_flight=_env_int("MAX_CONCURRENT_GENERATIONS", 4),
+    per_client_limit=os.getenv("GENERATION_RATE_LIMIT", "10/minute"),
+)
+
+# Per-client limit applied to every route by slowapi; generations are limited separately above
+DEFAULT_RATE_LIMIT = os.getenv("DEFAULT_RATE_LIMIT", "300/minute")
@@ -0,0 +1,143 @@
+"""
+Host-local cache shared by every worker process
+A small SQLite database (on /dev/shm when available) holding read-mostly state:
+the compiled watchlist index, encoded scan/brief payloads and brief generation
+progress. Disabled unless SHARED_CACHE_PATH is set, e.g. by backend/gunicorn.conf.py
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+# Rows past their TTL are swept at most this often by whichever worker notices first
+PURGE_INTERVAL_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID
+"""
+
+
+class SharedCache:
+    """Pickled values in SQLite, keyed by (namespace, key) and guarded by a fingerprint
+
+    Connections are per thread and per process, so the cache stays usable after
+    gunicorn forks workers from a preloaded master. Every error is logged and
+    treated as a miss: the shared tier only ever saves work, it never fails a request.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str, fingerprint: str = "") -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ? AND fingerprint = ? AND expires_at > ?",
+                (namespace, key, fingerprint, time.time()),
+            ).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Shared cache read failed ({namespace}/{key}): {e}")
+            return None
+
+    def put(self, namespace: str, key: str, value: Any, fingerprint: str = "", ttl: float = 600.0) -> None:
+        if not self.enabled:
+            return
+        try:
+            now = time.time()
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, fingerprint, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl),
+            )
+            if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = now
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        except Exception as e:
+            logger.warning(f"Shared cache write failed ({namespace}/{key}): {e}")
+
+    def invalidate(self, namespace: str, key: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._connection().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed ({namespace}/{key}): {e}")
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._connection().execute("DELETE FROM entries")
+        except Exception as e:
+            logger.warning(f"Shared cache clear failed: {e}")
+
+
+class SharedDict:
+    """Dict-like view of one namespace, falling back to a process-local dict when sharing is off
+
+    Used for generation progress so a client polling any worker sees the
+    generation another worker is running.
+    """
+
+    def __init__(self, cache: SharedCache, namespace: str, ttl: float):
+        self.cache = cache
+        self.namespace = namespace
+        self.ttl = ttl
+        self._local: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self.cache.enabled:
+            self.cache.put(self.namespace, key, value, ttl=self.ttl)
+        else:
+            self._local[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if self.cache.enabled:
+            value = self.cache.get(self.namespace, key)
+            return default if value is None else value
+        return self._local.get(key, default)
+
+
+shared_cache = SharedCache(SHARED_CACHE_PATH)
@@ -0,0 +1,180 @@
+"""
+Tiered cache of ingredient research summaries
+Sits in front of the ingredient_summaries collection: an in-process LRU with a
+TTL, then the host-local shared cache, then Firestore. "No summary yet" is
+cached too, briefly, since a missing summary is what a generation is about to fill
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from backend.utils.metrics import record_cache
+from backend.utils.prompts import PROMPT_VERSION
+from backend.utils.shared_cache import SharedCache, shared_cache
+
+logger = logging.getLogger(__name__)
+
+SUMMARIES_COLLECTION = "ingredient_summaries"
+
+SUMMARY_CACHE_ENTRIES = int(os.getenv("SUMMARY_CACHE_ENTRIES", 4096))
+# Summaries are written once and only replaced by a regeneration, so hits can live long
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", 3600))
+# Misses go stale as soon as any worker stores the summary; keep them short in case no listener tells us
+SUMMARY_NEGATIVE_TTL = float(os.getenv("SUMMARY_NEGATIVE_TTL", 15))
+# Listen to ingredient_summaries so writes from other workers and hosts invalidate this cache
+SUMMARY_CHANGE_LISTENER = os.getenv("SUMMARY_CHANGE_LISTENER", "1") == "1"
+
+
+@dataclass(frozen=True)
+class StoredSummary:
+    """A stored brief and the prompt template it was generated with (None for briefs older than versioning)"""
+    summary: str
+    prompt_version: Optional[str] = None
+
+    @property
+    def current(self) -> bool:
+        return self.prompt_version == PROMPT_VERSION
+
+
+def stored_summary(data: Optional[Dict]) -> Optional[StoredSummary]:
+    """StoredSummary of an ingredient_summaries document, or None when it holds no summary"""
+    if not data or not data.get("summary"):
+        return None
+    return StoredSummary(data["summary"], data.get("prompt_version"))
+
+
+class SummaryCache:
+    """LRU + TTL of StoredSummary (None = known to have no summary), keyed by lower-cased ingredient
+
+    Reads call lookup() and, on a miss, fill() with the Firestore result and the
+    epoch lookup() returned. Any write bumps the epoch, so a read that raced a
+    write can never cache the older value.
+    """
+
+    def __init__(self, name: str = "summary_cache", max_entries: int = SUMMARY_CACHE_ENTRIES,
+                 ttl: float = SUMMARY_CACHE_TTL, negative_ttl: float = SUMMARY_NEGATIVE_TTL,
+                 shared: SharedCache = shared_cache):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.shared = shared
+        self._entries: "OrderedDict[str, Tuple[Optional[StoredSummary], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._counts = {"hits": 0, "negative_hits": 0, "shared_hits": 0, "misses": 0}
+        self._watch = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str) -> Tuple[bool, Optional[StoredSummary], int]:
+        """(cached, stored brief, epoch); the brief is None for a cached miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counts["negative_hits" if entry[0] is None else "hits"] += 1
+            epoch = self._epoch
+        if entry is None:
+            # Only stored briefs are shared; a miss is too short-lived to be worth a cross-worker write
+            stored = self.shared.get(self.name, key)
+            if stored is not None:
+                with self._lock:
+                    self._counts["shared_hits"] += 1
+                self._store(key, stored, epoch)
+                entry = (stored, 0.0)
+        record_cache(self.name, entry is not None)
+        if entry is None:
+            with self._lock:
+                self._counts["misses"] += 1
+            return False, None, epoch
+        return True, entry[0], epoch
+
+    def fill(self, key: str, stored: Optional[StoredSummary], epoch: int) -> None:
+        """Cache what a read found, unless something was written since lookup()"""
+        if self._store(key, stored, epoch) and stored is not None:
+            self.shared.put(self.name, key, stored, ttl=self.ttl)
+
+    def put(self, key: str, stored: Optional[StoredSummary], shared: bool = True) -> None:
+        """Record a write: replaces the entry (in both tiers unless `shared` is False) and invalidates in-flight reads"""
+        with self._lock:
+            self._epoch += 1
+            epoch = self._epoch
+        self._store(key, stored, epoch)
+        if not shared:
+            return
+        if stored is None:
+            self.shared.invalidate(self.name, key)
+        else:
+            self.shared.put(self.name, key, stored, ttl=self.ttl)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.pop(key, None)
+        self.shared.invalidate(self.name, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def _store(self, key: str, stored: Optional[StoredSummary], epoch: int) -> bool:
+        expires_at = time.monotonic() + (self.ttl if stored is not None else self.negative_ttl)
+        with self._lock:
+            if epoch != self._epoch:
+                return False
+            self._entries[key] = (stored, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = sum(counts.values())
+        hits = counts["hits"] + counts["negative_hits"] + counts["shared_hits"]
+        return {**counts, "entries": len(self._entries), "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
+    # Change listener
+    def listen(self, db) -> bool:
+        """Follow summaries written from now on, wherever they are written; returns whether listening"""
+        if not SUMMARY_CHANGE_LISTENER or self._watch is not None:
+            return self._watch is not None
+        try:
+            query = db.collection(SUMMARIES_COLLECTION).where("updated_at", ">", datetime.now(timezone.utc))
+            self._watch = query.on_snapshot(self._on_snapshot)
+            return True
+        except Exception as e:
+            # Without a listener, misses still expire after SUMMARY_NEGATIVE_TTL
+            logger.warning(f"Summary change listener unavailable: {e}")
+            return False
+
+    def _on_snapshot(self, docs, changes, read_time) -> None:
+        for change in changes:
+            key = change.document.id
+            if change.type.name == "REMOVED":
+                self.invalidate(key)
+            else:
+                # The writer may be on another host, so the host-local shared tier is refreshed here too
+                self.put(key, stored_summary(change.document.to_dict()))
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+
+summary_cache = SummaryCache()
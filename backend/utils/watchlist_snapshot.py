@@ -0,0 +1,276 @@
+"""
+Versioned binary snapshot of the compiled watchlist
+Holds every flaggable name and alias with its ingredient and category, the
+normalization rules and the auto-flag patterns. Servers memory-map it at startup
+instead of compiling the watchlist from Firestore, and the app downloads it from
+/watchlist/snapshot to flag ingredients offline.
+
+Layout (little-endian, all offsets in bytes):
+  header      magic "VWLS", u16 format version, u16 section count,
+              u64 watchlist version, u32 CRC-32 of everything after the header, u32 reserved
+  directory   per section: 4-byte tag, u32 offset from the start of the file, u32 length
+  STRS        UTF-8 string heap; strings are referenced as (u32 offset, u32 length) into it
+  CATS        per category: id, name, severity (string refs)
+  INGS        per ingredient: id, name, severity, health concerns (joined with U+001F) (string refs),
+              u32 flags (1 = has a research summary), u32 category index (0xFFFFFFFF = none)
+  NAME        per name or alias, sorted by UTF-8 bytes: name (string ref), u32 ingredient index
+  NORM        key/value string ref pairs describing how label text is normalized and flagged
+  RULE        per auto-flag pattern: pattern (string ref), u32 flags (1 = case-insensitive)
+
+Snapshots are deterministic: the same watchlist always produces the same bytes.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"VWLS"
+FORMAT_VERSION = 2
+MEDIA_TYPE = "application/vnd.vireo.watchlist-snapshot"
+
+HEADER = struct.Struct("<4sHHQII")
+SECTION = struct.Struct("<4sII")
+CATEGORY = struct.Struct("<6I")
+INGREDIENT = struct.Struct("<10I")
+NAME = struct.Struct("<3I")
+NORM = struct.Struct("<4I")
+RULE = struct.Struct("<3I")
+
+NO_CATEGORY = 0xFFFFFFFF
+RULE_IGNORECASE = 1
+INGREDIENT_HAS_SUMMARY = 1
+LIST_SEPARATOR = "\x1f"
+
+# How flagging turns label text into lookups; mirrored by every client that reads a snapshot
+NORMALIZATION = {
+    "separator": ",",
+    "case": "lower",
+    "strip": "whitespace",
+    "match": "exact",
+    "rule_match": "prefix",
+    "severity_fallback": "ingredient,category,moderate",
+    "unknown_category": "Unknown",
+    "auto_flag_category": "Auto-Flagged",
+    "auto_flag_severity": "moderate",
+}
+
+
+@dataclass
+class SnapshotCategory:
+    id: str
+    name: str
+    severity_level: str
+
+
+@dataclass
+class SnapshotIngredient:
+    id: str
+    name: str
+    severity_level: str
+    health_concerns: List[str]
+    has_research_summary: bool
+    category: Optional[SnapshotCategory]
+
+
+class _StringHeap:
+    def __init__(self):
+        self._data = bytearray()
+        self._refs: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, text: Optional[str]) -> Tuple[int, int]:
+        text = text or ""
+        if text not in self._refs:
+            encoded = text.encode("utf-8")
+            self._refs[text] = (len(self._data), len(encoded))
+            self._data += encoded
+        return self._refs[text]
+
+    def bytes(self) -> bytes:
+        return bytes(self._data)
+
+
+def build_snapshot(version: int, entries: Dict[str, Tuple[object, Optional[object]]],
+                   rules: Iterable[str], rule_flags: int = RULE_IGNORECASE) -> bytes:
+    """Serialize a compiled watchlist (name -> (ingredient, category)) and the auto-flag rules"""
+    heap = _StringHeap()
+
+    categories = sorted({category.id: category for _, category in entries.values() if category}.values(),
+                        key=lambda category: category.id)
+    category_index = {category.id: i for i, category in enumerate(categories)}
+    cats = bytearray()
+    for category in categories:
+        cats += CATEGORY.pack(*heap.add(category.id), *heap.add(category.name), *heap.add(category.severity_level))
+
+    ingredients = sorted({ingredient.id: (ingredient, category) for ingredient, category in entries.values()}.values(),
+                         key=lambda entry: entry[0].id)
+    ingredient_index = {ingredient.id: i for i, (ingredient, _) in enumerate(ingredients)}
+    ings = bytearray()
+    for ingredient, category in ingredients:
+        ings += INGREDIENT.pack(
+            *heap.add(ingredient.id), *heap.add(ingredient.name), *heap.add(ingredient.severity_level),
+            *heap.add(LIST_SEPARATOR.join(ingredient.health_concerns or [])),
+            INGREDIENT_HAS_SUMMARY if ingredient.research_summary else 0,
+            category_index[category.id] if category else NO_CATEGORY,
+        )
+
+    names = bytearray()
+    for key, (ingredient, _) in sorted(entries.items(), key=lambda item: item[0].encode("utf-8")):
+        names += NAME.pack(*heap.add(key), ingredient_index[ingredient.id])
+
+    norm = bytearray()
+    for key, value in sorted(NORMALIZATION.items()):
+        norm += NORM.pack(*heap.add(key), *heap.add(value))
+
+    rule_table = bytearray()
+    for pattern in rules:
+        rule_table += RULE.pack(*heap.add(pattern), rule_flags)
+
+    sections = [(b"STRS", heap.bytes()), (b"CATS", bytes(cats)), (b"INGS", bytes(ings)),
+                (b"NAME", bytes(names)), (b"NORM", bytes(norm)), (b"RULE", bytes(rule_table))]
+    offset = HEADER.size + SECTION.size * len(sections)
+    directory = bytearray()
+    for tag, data in sections:
+        directory += SECTION.pack(tag, offset, len(data))
+        offset += len(data)
+    body = bytes(directory) + b"".join(data for _, data in sections)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), version, zlib.crc32(body), 0) + body
+
+
+def snapshot_etag(data) -> str:
+    """Strong ETag from the header alone: format, watchlist version and content checksum"""
+    _, format_version, _, version, checksum, _ = HEADER.unpack_from(data, 0)
+    return f'"wls{format_version}-{version}-{checksum:08x}"'
+
+
+class WatchlistSnapshot:
+    """Read-only view over snapshot bytes or a memory-mapped snapshot file
+
+    Nothing is decoded up front: names are binary-searched in place, so opening a
+    snapshot costs a checksum pass and lookups touch only the pages they need.
+    """
+
+    def __init__(self, data, verify: bool = True):
+        self._data = data
+        self._view = memoryview(data)
+        if len(data) < HEADER.size:
+            raise ValueError("Watchlist snapshot is truncated")
+        magic, format_version, section_count, self.version, self.checksum, _ = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a watchlist snapshot")
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported watchlist snapshot format {format_version}")
+        if verify and zlib.crc32(self._view[HEADER.size:]) != self.checksum:
+            raise ValueError("Watchlist snapshot checksum mismatch")
+
+        self._sections: Dict[bytes, Tuple[int, int]] = {}
+        for i in range(section_count):
+            tag, offset, length = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+            if offset + length > len(data):
+                raise ValueError(f"Watchlist snapshot section {tag!r} is truncated")
+            self._sections[tag] = (offset, length)
+        self._strings = self._sections[b"STRS"][0]
+        self._names_offset, names_length = self._sections[b"NAME"]
+        self._name_count = names_length // NAME.size
+
+    @property
+    def data(self) -> bytes:
+        return bytes(self._view)
+
+    @property
+    def etag(self) -> str:
+        return snapshot_etag(self._data)
+
+    def __len__(self) -> int:
+        return self._name_count
+
+    def _raw(self, offset: int, length: int) -> memoryview:
+        return self._view[self._strings + offset:self._strings + offset + length]
+
+    def _string(self, offset: int, length: int) -> str:
+        return str(self._raw(offset, length), "utf-8")
+
+    def _records(self, tag: bytes, record: struct.Struct) -> Iterator[tuple]:
+        offset, length = self._sections.get(tag, (0, 0))
+        for start in range(offset, offset + length - record.size + 1, record.size):
+            yield record.unpack_from(self._data, start)
+
+    def _category(self, index: int) -> Optional[SnapshotCategory]:
+        if index == NO_CATEGORY:
+            return None
+        fields = CATEGORY.unpack_from(self._data, self._sections[b"CATS"][0] + index * CATEGORY.size)
+        return SnapshotCategory(self._string(*fields[0:2]), self._string(*fields[2:4]), self._string(*fields[4:6]))
+
+    def _ingredient(self, index: int) -> SnapshotIngredient:
+        fields = INGREDIENT.unpack_from(self._data, self._sections[b"INGS"][0] + index * INGREDIENT.size)
+        concerns = self._string(*fields[6:8])
+        return SnapshotIngredient(
+            id=self._string(*fields[0:2]),
+            name=self._string(*fields[2:4]),
+            severity_level=self._string(*fields[4:6]),
+            health_concerns=concerns.split(LIST_SEPARATOR) if concerns else [],
+            has_research_summary=bool(fields[8] & INGREDIENT_HAS_SUMMARY),
+            category=self._category(fields[9]),
+        )
+
+    def _name_at(self, position: int) -> Tuple[int, int, int]:
+        offset, length, ingredient = NAME.unpack_from(self._data, self._names_offset + position * NAME.size)
+        return self._strings + offset, self._strings + offset + length, ingredient
+
+    def lookup(self, name: str) -> Optional[SnapshotIngredient]:
+        """Ingredient for an already normalized name or alias"""
+        target = name.encode("utf-8")
+        data = self._data
+        low, high = 0, self._name_count
+        while low < high:
+            middle = (low + high) // 2
+            start, end, ingredient = self._name_at(middle)
+            key = data[start:end]
+            if key < target:
+                low = middle + 1
+            elif key > target:
+                high = middle
+            else:
+                return self._ingredient(ingredient)
+        return None
+
+    def names(self) -> Iterator[str]:
+        for position in range(self._name_count):
+            start, end, _ = self._name_at(position)
+            yield str(self._data[start:end], "utf-8")
+
+    @property
+    def normalization(self) -> Dict[str, str]:
+        return {self._string(*fields[0:2]): self._string(*fields[2:4]) for fields in self._records(b"NORM", NORM)}
+
+    @property
+    def rules(self) -> List[str]:
+        return [self._string(*fields[0:2]) for fields in self._records(b"RULE", RULE)]
+
+    def close(self) -> None:
+        self._view.release()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+
+def open_snapshot(path: str) -> WatchlistSnapshot:
+    """Memory-map a snapshot file; raises ValueError when it is not a usable snapshot"""
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return WatchlistSnapshot(data)
+    except Exception:
+        data.close()
+        raise
+
+
+def write_snapshot(path: str, data: bytes) -> None:
+    """Atomically replace the snapshot file, so workers never map a half-written one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
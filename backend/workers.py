@@ -0,0 +1,11 @@
+"""
+Gunicorn worker class for the production runner (see backend/gunicorn.conf.py)
+"""
+
+from uvicorn.workers import UvicornWorker
+
+
+class VireoWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools instead of auto-detection"""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
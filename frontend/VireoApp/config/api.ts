@@ -6,4 +6,5 @@ export const API_ENDPOINTS = {
   SCAN: `${API_BASE_URL}/scan`,
   INGREDIENT_BRIEF: `${API_BASE_URL}/ingredient-brief`,
   INGREDIENT_BRIEF_PROGRESS: `${API_BASE_URL}/ingredient-brief-progress`,
+  WATCHLIST_SNAPSHOT: `${API_BASE_URL}/watchlist/snapshot`,
 };
@@ -54,11 +54,24 @@ export const AdminPanel: React.FC = () => {
     loadIngredients();
   }, []);
 
+  // Follow next_cursor until the listing is exhausted; unchanged pages come back as 304s from the browser cache
+  const fetchAllPages = async <T,>(path: string, key: string): Promise<T[]> => {
+    const items: T[] = [];
+    let cursor: string | null = null;
+    do {
+      const separator = path.includes('?') ? '&' : '?';
+      const url = `${API_BASE}${path}${cursor ? `${separator}cursor=${encodeURIComponent(cursor)}` : ''}`;
+      const response = await fetch(url, { cache: 'no-cache' });
+      const data = await response.json();
+      items.push(...data[key]);
+      cursor = data.next_cursor;
+    } while (cursor);
+    return items;
+  };
+
   const loadCategories = async () => {
     try {
-      const response = await fetch(`${API_BASE}/admin/categories`);
-      const data = await response.json();
-      setCategories(data.categories);
+      setCategories(await fetchAllPages<Category>('/admin/categories?limit=500', 'categories'));
     } catch (error) {
       console.error('Error loading categories:', error);
     }
@@ -66,9 +79,7 @@ export const AdminPanel: React.FC = () => {
 
   const loadIngredients = async () => {
     try {
-      const response = await fetch(`${API_BASE}/admin/ingredients`);
-      const data = await response.json();
-      setIngredients(data.ingredients);
+      setIngredients(await fetchAllPages<Ingredient>('/admin/ingredients?limit=500&include_summary=false', 'ingredients'));
     } catch (error) {
       console.error('Error loading ingredients:', error);
     }